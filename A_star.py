@@ -3,6 +3,11 @@ import heapq
 import itertools
 from random import randint
 
+import numpy as np
+
+from graph_core import walk_parents
+from search_cache import bump_graph_version
+
 # Use the same Node class as before
 class Node:
     def __init__(self, name, danger_cost, trap=False, x=0, y=0, heuristic=0):
@@ -16,6 +21,7 @@ class Node:
 
     def add_door(self, door_name, node, cost):
         self.doors[door_name] = (node, cost)
+        bump_graph_version()
 
     def __repr__(self):
         return f"Node({self.name}, x={self.x}, y={self.y}, heuristic={self.heuristic}, trap={self.trap})"
@@ -43,23 +49,70 @@ class A_star_game:
 
         frontier = []
         counter = itertools.count()
-        # use stored heuristic
-        heapq.heappush(frontier, (0 + self.start.heuristic, next(counter), self.start, 0, []))
-        visited = set()
+        # use stored heuristic; entries carry the node they were reached from
+        heapq.heappush(frontier, (0 + self.start.heuristic, next(counter), self.start, 0, None))
+        came_from = {}  # name -> predecessor node, fixed when the node is expanded
 
         while frontier:
-            f_score, _, current, g_score, path = heapq.heappop(frontier)
-            if current.name in visited:
+            f_score, _, current, g_score, parent = heapq.heappop(frontier)
+            if current.name in came_from:
                 continue
-            visited.add(current.name)
-            new_path = path + [current]
+            came_from[current.name] = parent
 
             if current == self.goal:
-                return g_score, new_path
+                return g_score, self._path_to(current, came_from)
 
             for neighbor, edge_cost in current.doors.values():
                 new_g = g_score + neighbor.danger_cost + edge_cost
                 f = new_g + neighbor.heuristic  # use precomputed heuristic
-                heapq.heappush(frontier, (f, next(counter), neighbor, new_g, new_path))
+                heapq.heappush(frontier, (f, next(counter), neighbor, new_g, current))
+
+        return float('inf'), []
+
+    @staticmethod
+    def _path_to(node, came_from):
+        path = [node]
+        while came_from[path[-1].name] is not None:
+            path.append(came_from[path[-1].name])
+        path.reverse()
+        return path
+
 
+# A* over a graph_core.RoomGraph: same cost model and heuristic, no Node objects
+class A_star_graph:
+    def __init__(self, graph, start, goal):
+        self.graph = graph
+        self.start = graph.index_of(start)
+        self.goal = graph.index_of(goal)
+        self.current = self.start
+        gx, gy = graph.x[self.goal], graph.y[self.goal]
+        self.heuristic = np.round(np.hypot(graph.x - gx, graph.y - gy), 1)
+
+    def search(self):
+        """(cost, [room index, ...]) from start to goal, like A_star_game.search()."""
+        offsets, neighbors, costs, danger = self.graph.csr()
+        h = memoryview(self.heuristic)
+        n = len(self.graph)
+        best = memoryview(np.full(n, np.inf))
+        parent = np.full(n, -1, dtype=np.int32)
+        par = memoryview(parent)
+        closed = bytearray(n)
+        start, goal = self.start, self.goal
+        best[start] = 0.0
+        counter = itertools.count()
+        frontier = [(h[start], next(counter), start, 0.0)]
+        while frontier:
+            _, _, u, g = heapq.heappop(frontier)
+            if closed[u]:
+                continue
+            closed[u] = 1
+            if u == goal:
+                return g, walk_parents(parent, u)
+            for e in range(offsets[u], offsets[u + 1]):
+                v = neighbors[e]
+                new_g = g + danger[v] + costs[e]
+                if not closed[v] and new_g < best[v]:
+                    best[v] = new_g
+                    par[v] = u
+                    heapq.heappush(frontier, (new_g + h[v], next(counter), v, new_g))
         return float('inf'), []
@@ -1,5 +1,10 @@
 from collections import deque
 
+import numpy as np
+
+from graph_core import walk_parents
+from search_cache import SEARCH_CACHE, bump_graph_version
+
 class Node:
     def __init__(self, name, hint="", trap=False):
         self.name = name
@@ -9,6 +14,7 @@ class Node:
 
     def add_door(self, door_name, node):
         self.doors[door_name] = node
+        bump_graph_version()
 
     def __repr__(self):
         return f"Node({self.name})"
@@ -26,25 +32,24 @@ class BFSGame:
 
     def breadth_first_search(self, start, goal):
         """Return shortest path (by edges) from start to goal."""
-        queue = deque([(start, [])])  # (current_node, path)
-        visited = set()
+        came_from = {start: None}  # node -> node it was first reached from
+        queue = deque([start])
 
         while queue:
-            current, path = queue.popleft()
-            
-            if current in visited:
-                continue
-            visited.add(current)
-            
-            new_path = path + [current]
+            current = queue.popleft()
 
             if current == goal:
-                return new_path
+                path = [current]
+                while came_from[path[-1]] is not None:
+                    path.append(came_from[path[-1]])
+                path.reverse()
+                return path
 
             for door, neighbor in current.doors.items():
-                if neighbor not in visited:
-                    queue.append((neighbor, new_path))
-        
+                if neighbor not in came_from:
+                    came_from[neighbor] = current
+                    queue.append(neighbor)
+
         return []
 
     def get_current_options(self):
@@ -85,5 +90,42 @@ class BFSGame:
         return self.dead
 
     def get_shortest_path_to_goal(self):
-        path = self.breadth_first_search(self.current, self.goal)
-        return path
\ No newline at end of file
+        # memoized until the graph changes; copied so callers can't edit the cached path
+        path = SEARCH_CACHE.lookup(self.nodes, "bfs", "hops", self.current.name, self.goal.name,
+                                   lambda: self.breadth_first_search(self.current, self.goal))
+        return list(path)
+
+
+class BFSGraph:
+    """BFSGame's search over a graph_core.RoomGraph (rooms are indices)."""
+
+    def __init__(self, graph, start, goal):
+        self.graph = graph
+        self.start = graph.index_of(start)
+        self.goal = graph.index_of(goal)
+        self.current = self.start
+
+    def breadth_first_search(self, start, goal):
+        """Shortest path (by doors) as room indices; [] if unreachable."""
+        offsets, neighbors, _, _ = self.graph.csr()
+        start, goal = self.graph.index_of(start), self.graph.index_of(goal)
+        n = len(self.graph)
+        parent = np.full(n, -1, dtype=np.int32)
+        par = memoryview(parent)
+        seen = bytearray(n)
+        seen[start] = 1
+        queue = deque([start])
+        while queue:
+            current = queue.popleft()
+            if current == goal:
+                return walk_parents(parent, current)
+            for e in range(offsets[current], offsets[current + 1]):
+                neighbor = neighbors[e]
+                if not seen[neighbor]:
+                    seen[neighbor] = 1
+                    par[neighbor] = current
+                    queue.append(neighbor)
+        return []
+
+    def get_shortest_path_to_goal(self):
+        return self.breadth_first_search(self.current, self.goal)
@@ -1,4 +1,7 @@
 import heapq
+import itertools
+
+from search_cache import bump_graph_version
 
 class Node:
     def __init__(self, name, danger_cost=1, trap=False):
@@ -9,6 +12,7 @@ class Node:
 
     def add_door(self, door_name, node, cost=1):
         self.doors[door_name] = (node, cost)
+        bump_graph_version()
 
     def __repr__(self):
         return f"Node({self.name})"
@@ -26,22 +30,28 @@ class UCSGame:
         self.path_history = [self.start]
 
     def uniform_cost_search(self, start, goal):
-        frontier = [(0, start, [])]
-        visited = set()
+        # (cost, tie-breaker, node, node it was reached from); the counter keeps
+        # equal-cost entries from comparing Nodes
+        counter = itertools.count()
+        frontier = [(0, next(counter), start, None)]
+        came_from = {}  # name -> predecessor node, fixed when the node is expanded
 
         while frontier:
-            cost, current, path = heapq.heappop(frontier)
-            if current.name in visited:
+            cost, _, current, parent = heapq.heappop(frontier)
+            if current.name in came_from:
                 continue
-            visited.add(current.name)
-            new_path = path + [current]
+            came_from[current.name] = parent
 
             if current.name == goal.name:
-                return cost, new_path
+                path = [current]
+                while came_from[path[-1].name] is not None:
+                    path.append(came_from[path[-1].name])
+                path.reverse()
+                return cost, path
 
             for neighbor, edge_cost in current.doors.values():
                 total_cost = cost + neighbor.danger_cost + edge_cost
-                heapq.heappush(frontier, (total_cost, neighbor, new_path))
+                heapq.heappush(frontier, (total_cost, next(counter), neighbor, current))
 
         return float("inf"), []
 
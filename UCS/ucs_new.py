@@ -2,6 +2,22 @@ import heapq
 import itertools
 import random
 
+import numpy as np
+
+from graph_core import RoomGraph, walk_parents
+from search_cache import SEARCH_CACHE, bump_graph_version, graph_version
+
+try:
+    from constants import UCS_ENGINE
+except Exception:
+    UCS_ENGINE = "heap"
+
+# "heap": one-sided heapq Dijkstra; "bidirectional": searches from both ends
+# and stops when they meet; "bucket": Dial's bucket queue over costs in
+# FIXED_POINT units (danger is an integer, door costs are rounded to 0.01)
+ENGINES = ("heap", "bidirectional", "bucket")
+FIXED_POINT = 100
+
 class Node:
     def __init__(self, name, danger_cost, trap=False):
         self.name = name
@@ -11,46 +27,72 @@ class Node:
 
     def add_door(self, door_name, node, cost):
         self.doors[door_name] = (node, cost)
+        bump_graph_version()
 
     def __repr__(self):
         return f"Node({self.name, self.danger_cost, self.trap})"
 
 
 class UCSGame:
-    def __init__(self, nodes, start_name, goal_name):
+    def __init__(self, nodes, start_name, goal_name, engine=UCS_ENGINE):
         self.nodes = nodes
         self.start = self.nodes[start_name]
         self.goal = self.nodes[goal_name]
+        self.engine = engine
+        self._snapshot = None  # (graph version, UCSGraph over a RoomGraph of nodes)
 
         self.current = self.start
         self.total_cost = 0
         self.dead = False
         self.path_history = [self.start]
 
-    def uniform_cost_search(self, start, goal):
+    def uniform_cost_search(self, start, goal, engine=None):
+        """(cost, [Node, ...]) from start to goal; `engine` (default self.engine)
+        is one of ENGINES. The other engines run on a RoomGraph snapshot of
+        the nodes, rebuilt when the graph version changes."""
+        engine = engine or self.engine
+        if engine != "heap":
+            search = self._graph_search()
+            cost, path = search.uniform_cost_search(search.graph.index_of(start.name),
+                                                    search.graph.index_of(goal.name), engine)
+            return cost, [self.nodes[name] for name in search.graph.path_names(path)]
         frontier = []
         counter = itertools.count()
-        # push (cost, tie_breaker, node, path)
-        heapq.heappush(frontier, (0, next(counter), start, []))
-        visited = set()
+        # push (cost, tie_breaker, node, node it was reached from)
+        heapq.heappush(frontier, (0, next(counter), start, None))
+        came_from = {}  # name -> predecessor node, fixed when the node is expanded
 
         while frontier:
-            cost, _, current, path = heapq.heappop(frontier)
-            if current.name in visited:
+            cost, _, current, parent = heapq.heappop(frontier)
+            if current.name in came_from:
                 continue
-            visited.add(current.name)
-            new_path = path + [current]
+            came_from[current.name] = parent
 
             if current.name == goal.name:
-                return cost, new_path
+                return cost, self._path_to(current, came_from)
 
             for neighbor, edge_cost in current.doors.values():
 
                 total_cost = cost + neighbor.danger_cost + edge_cost
-                heapq.heappush(frontier, (total_cost, next(counter), neighbor, new_path))
+                heapq.heappush(frontier, (total_cost, next(counter), neighbor, current))
 
         return float("inf"), []
 
+    def _graph_search(self):
+        version = graph_version()
+        if self._snapshot is None or self._snapshot[0] != version:
+            graph = RoomGraph.from_nodes(self.nodes)
+            self._snapshot = (version, UCSGraph(graph, self.start.name, self.goal.name, self.engine))
+        return self._snapshot[1]
+
+    @staticmethod
+    def _path_to(node, came_from):
+        path = [node]
+        while came_from[path[-1].name] is not None:
+            path.append(came_from[path[-1].name])
+        path.reverse()
+        return path
+
     def get_current_options(self):
         """Return available doors with neighbor, cost, and intuitive hint"""
         options = []
@@ -95,10 +137,216 @@ class UCSGame:
     def is_goal_reached(self):
         return self.current == self.goal
 
+    def get_least_cost_to_goal(self):
+        cost, _ = self.cached_search(self.current, self.goal)
+        return cost
+
+    def cached_search(self, start, goal):
+        """uniform_cost_search memoized in SEARCH_CACHE until the graph changes."""
+        cost, path = SEARCH_CACHE.lookup(self.nodes, "ucs", "danger+edge", start.name, goal.name,
+                                         lambda: self.uniform_cost_search(start, goal))
+        return cost, list(path)
+
+
+class UCSGraph:
+    """UCSGame's searches over a graph_core.RoomGraph (rooms are indices).
+
+    `engine` picks the search (see ENGINES); all of them find the same
+    cheapest cost. Code that writes new costs into the graph's arrays must
+    call bump_graph_version() so the bucket engine re-derives its integer
+    step costs.
+    """
+
+    def __init__(self, graph, start, goal, engine=UCS_ENGINE):
+        self.graph = graph
+        self.start = graph.index_of(start)
+        self.goal = graph.index_of(goal)
+        self.current = self.start
+        self.engine = engine
+        self._reverse = None  # reverse CSR, built on the first bidirectional search
+        self._steps = None    # (graph version, integer step cost per door or None, bucket ring size)
+
+    def uniform_cost_search(self, start, goal, engine=None):
+        """(cost, [room index, ...]); stepping into a room costs its danger + the door cost."""
+        engine = engine or self.engine
+        start, goal = self.graph.index_of(start), self.graph.index_of(goal)
+        if engine == "heap":
+            return self._heap_search(start, goal)
+        if engine == "bidirectional":
+            return self._bidirectional_search(start, goal)
+        if engine == "bucket":
+            return self._bucket_search(start, goal)
+        raise ValueError(f"unknown UCS engine {engine!r} (expected one of {', '.join(ENGINES)})")
+
+    def _heap_search(self, start, goal):
+        offsets, neighbors, costs, danger = self.graph.csr()
+        n = len(self.graph)
+        best = memoryview(np.full(n, np.inf))
+        parent = np.full(n, -1, dtype=np.int32)
+        par = memoryview(parent)
+        closed = bytearray(n)
+        best[start] = 0.0
+        counter = itertools.count()
+        frontier = [(0.0, next(counter), start)]
+        while frontier:
+            cost, _, u = heapq.heappop(frontier)
+            if closed[u]:
+                continue
+            closed[u] = 1
+            if u == goal:
+                return cost, walk_parents(parent, u)
+            for e in range(offsets[u], offsets[u + 1]):
+                v = neighbors[e]
+                total_cost = cost + danger[v] + costs[e]
+                if not closed[v] and total_cost < best[v]:
+                    best[v] = total_cost
+                    par[v] = u
+                    heapq.heappush(frontier, (total_cost, next(counter), v))
+        return float("inf"), []
+
+    def _route_cost(self, path):
+        """Cost of a room path, summed in the order the heap search adds it."""
+        offsets, neighbors, costs, danger = self.graph.csr()
+        cost = 0
+        for u, v in zip(path, path[1:]):
+            cost = cost + danger[v] + min(costs[e] for e in range(offsets[u], offsets[u + 1]) if neighbors[e] == v)
+        return cost
+
+    # ---------- bidirectional ----------
+    def _bidirectional_search(self, start, goal):
+        """Dijkstra from start over the doors and from goal over reversed doors,
+        alternating on the smaller frontier; stops once the two frontier
+        minima add up to the best meeting cost found."""
+        if start == goal:
+            return 0, [start]
+        offsets, neighbors, costs, danger = self.graph.csr()
+        if self._reverse is None:
+            g = self.graph
+            into = np.argsort(g.neighbors, kind="stable")
+            r_off = np.zeros(len(g) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(g.neighbors, minlength=len(g)), out=r_off[1:])
+            self._reverse = (memoryview(r_off), memoryview(into), memoryview(g.edge_sources()))
+        r_off, into, src = self._reverse
+        n = len(self.graph)
+        dist_f, dist_b = memoryview(np.full(n, np.inf)), memoryview(np.full(n, np.inf))
+        par_f, par_b = np.full(n, -1, dtype=np.int32), np.full(n, -1, dtype=np.int32)
+        pf, pb = memoryview(par_f), memoryview(par_b)
+        done_f, done_b = bytearray(n), bytearray(n)
+        dist_f[start] = dist_b[goal] = 0.0
+        heap_f, heap_b = [(0.0, start)], [(0.0, goal)]
+        best, meet = float("inf"), -1
+        while heap_f and heap_b:
+            if heap_f[0][0] + heap_b[0][0] >= best:
+                break
+            if len(heap_f) <= len(heap_b):
+                d, u = heapq.heappop(heap_f)
+                if done_f[u]:
+                    continue
+                done_f[u] = 1
+                for e in range(offsets[u], offsets[u + 1]):
+                    v = neighbors[e]
+                    nd = d + danger[v] + costs[e]
+                    if nd < dist_f[v]:
+                        dist_f[v] = nd
+                        pf[v] = u
+                        heapq.heappush(heap_f, (nd, v))
+                    if nd + dist_b[v] < best:
+                        best, meet = nd + dist_b[v], v
+            else:
+                d, v = heapq.heappop(heap_b)
+                if done_b[v]:
+                    continue
+                done_b[v] = 1
+                step = d + danger[v]
+                for k in range(r_off[v], r_off[v + 1]):
+                    e = into[k]
+                    u = src[e]
+                    nd = step + costs[e]
+                    if nd < dist_b[u]:
+                        dist_b[u] = nd
+                        pb[u] = v  # next room towards the goal
+                        heapq.heappush(heap_b, (nd, u))
+                    if nd + dist_f[u] < best:
+                        best, meet = nd + dist_f[u], u
+        if meet < 0:
+            return float("inf"), []
+        path = walk_parents(par_f, meet)
+        while path[-1] != goal:
+            path.append(int(par_b[path[-1]]))
+        return self._route_cost(path), path
+
+    # ---------- bucket queue ----------
+    def _step_costs(self):
+        """(integer cost of every door (target danger + door cost, in
+        1/FIXED_POINT units), largest cost + 1); (None, 0) if a cost isn't a
+        multiple of that."""
+        version = graph_version()
+        if self._steps is None or self._steps[0] != version:
+            g = self.graph
+            scaled = (g.danger[g.neighbors] + g.costs) * FIXED_POINT
+            steps = np.rint(scaled)
+            exact = np.all(np.abs(scaled - steps) <= 1e-6 * np.maximum(1.0, scaled)) and np.all(steps >= 0)
+            ok = exact and len(steps)
+            self._steps = (version, memoryview(steps.astype(np.int64)) if ok else None,
+                           int(steps.max()) + 1 if ok else 0)
+        return self._steps[1], self._steps[2]
+
+    def _bucket_search(self, start, goal):
+        """Dial's algorithm: a ring of max-step + 1 buckets indexed by integer
+        cost, visited in cost order, so no heap and no log factor. Falls back to the
+        heap search when the costs aren't fixed-point."""
+        steps, ring = self._step_costs()
+        if steps is None:
+            return self._heap_search(start, goal)
+        offsets, neighbors = memoryview(self.graph.offsets), memoryview(self.graph.neighbors)
+        n = len(self.graph)
+        unseen = np.iinfo(np.int64).max
+        dist = memoryview(np.full(n, unseen, dtype=np.int64))
+        parent = np.full(n, -1, dtype=np.int32)
+        par = memoryview(parent)
+        closed = bytearray(n)
+        buckets = [[] for _ in range(ring)]
+        occupied = bytearray(ring)  # 1 where a bucket holds rooms: find() skips empty runs in C
+        dist[start] = 0
+        buckets[0].append(start)
+        occupied[0] = 1
+        pending, d = 1, 0
+        while pending:
+            i = d % ring
+            if not occupied[i]:
+                j = occupied.find(1, i)
+                if j < 0:
+                    j = occupied.find(1)
+                d += (j - i) % ring
+                i = j
+            bucket = buckets[i]
+            while bucket:
+                u = bucket.pop()
+                pending -= 1
+                if closed[u]:
+                    continue
+                closed[u] = 1
+                if u == goal:
+                    path = walk_parents(parent, u)
+                    return self._route_cost(path), path
+                for e in range(offsets[u], offsets[u + 1]):
+                    v = neighbors[e]
+                    nd = d + steps[e]
+                    if nd < dist[v]:
+                        dist[v] = nd
+                        par[v] = u
+                        k = nd % ring
+                        buckets[k].append(v)
+                        occupied[k] = 1
+                        pending += 1
+            occupied[i] = 0
+            d += 1
+        return float("inf"), []
+
     def get_least_cost_to_goal(self):
         cost, _ = self.uniform_cost_search(self.current, self.goal)
         return cost
-    
+
 
 # Sample dungeon setup
 # Nodes: A, B, C, D, E
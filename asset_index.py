@@ -0,0 +1,228 @@
+"""One-time index of the folders tileset images are resolved against.
+
+Tiled maps reference tileset images by the path they had on the author's
+machine (``../../Downloads/...``), so RoomMap falls back to finding the file
+by name in a few project folders. Instead of probing each folder with
+``Path.exists()`` on every load, this lists the folders once, caches parsed
+external TSX files, and memoizes resolutions. Listings and TSX results are
+persisted in a small manifest, checked against directory/file mtimes, so a
+fresh process doesn't rescan unchanged folders either. Opening an index
+only reads the manifest; it is written by save().
+"""
+from __future__ import annotations
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, Tuple
+
+ALT_EXTS = (".png", ".webp", ".jpg", ".jpeg")  # same-stem fallbacks, in order
+MANIFEST_VERSION = 1
+
+
+def _norm(path: Path) -> Path:
+    """Absolute, '..'-free path without touching the filesystem (unlike resolve())."""
+    return Path(os.path.normpath(os.path.abspath(path)))
+
+
+class AssetIndex:
+    """Filename/stem lookups over a fixed list of asset folders (not recursive)."""
+
+    def __init__(self, roots: Iterable[str | Path], manifest: str | Path | None = None,
+                 read_only: bool = False):
+        self.roots = list(dict.fromkeys(_norm(Path(r)) for r in roots))  # ordered, no dupes
+        self.manifest = _norm(Path(manifest)) if manifest else None
+        self.read_only = read_only  # reads the manifest, never writes it (e.g. bake workers)
+        self._dirs: Dict[Path, Tuple[int | None, FrozenSet[str]]] = {}   # folder -> (mtime_ns, names)
+        self._tsx: Dict[str, Tuple[int | None, str | None]] = {}         # tsx -> (mtime_ns, image path)
+        self._tsx_checked: set[str] = set()      # TSX stamps verified by this process
+        self._exists: Dict[Path, bool] = {}      # paths outside the indexed folders
+        self._resolved: Dict[tuple, Path | None] = {}
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # one manifest write at a time, in call order
+        self._dirty = False
+        self._saved: Dict[str, dict] = self._read_manifest()
+        for root in self.roots:
+            self._listing(root)
+
+    # ---------- lookups ----------
+    def exists(self, path: Path) -> bool:
+        path = _norm(path)
+        parent = self._dirs.get(path.parent)
+        if parent is not None:
+            return path.name in parent[1]
+        with self._lock:
+            hit = self._exists.get(path)
+            if hit is None:
+                hit = self._exists[path] = path.exists()
+        return hit
+
+    def find_image(self, declared: Path | None, image_name: str | None, first_dir: Path | None = None) -> Path | None:
+        """`declared` if it exists, else `image_name` (or same stem with another
+        image extension) in first_dir and then each root, in order."""
+        key = (declared, image_name, first_dir)
+        if key in self._resolved:
+            return self._resolved[key]
+        found = None
+        if declared is not None and self.exists(declared):
+            found = _norm(declared)
+        elif image_name:
+            stem = Path(image_name).stem
+            folders = ([_norm(first_dir)] if first_dir is not None else []) + self.roots
+            for folder in dict.fromkeys(folders):
+                names = self._listing(folder)
+                if image_name in names:
+                    found = folder / image_name
+                    break
+                alt = next((stem + ext for ext in ALT_EXTS if stem + ext in names), None)
+                if alt:
+                    found = folder / alt
+                    break
+        self._resolved[key] = found
+        return found
+
+    def image_candidates(self, declared: Path | None, image_name: str | None,
+                         first_dir: Path | None = None) -> list[Path]:
+        """Every path find_image() would accept, in the order it tries them."""
+        out = [_norm(declared)] if declared is not None else []
+        if image_name:
+            stem = Path(image_name).stem
+            names = list(dict.fromkeys([image_name] + [stem + ext for ext in ALT_EXTS]))
+            folders = ([_norm(first_dir)] if first_dir is not None else []) + self.roots
+            out.extend(folder / name for folder in dict.fromkeys(folders) for name in names)
+        return out
+
+    def tsx_image(self, tsx_path: Path) -> Path | None:
+        """Image referenced by an external tileset (parsed once per file version)."""
+        key = _norm(tsx_path).as_posix()
+        if key not in self._tsx_checked:
+            try:
+                mtime = os.stat(key).st_mtime_ns
+            except OSError:
+                mtime = None
+            with self._lock:
+                cached = self._tsx.get(key) or self._saved_tsx(key)
+                if cached is None or cached[0] != mtime:
+                    cached = (mtime, self._parse_tsx(Path(key)) if mtime is not None else None)
+                    self._dirty = True
+                self._tsx[key] = cached
+                self._tsx_checked.add(key)
+        image = self._tsx[key][1]
+        return Path(image) if image else None
+
+    @staticmethod
+    def _parse_tsx(tsx_path: Path) -> str | None:
+        text = tsx_path.read_text(encoding="utf-8")
+        m = re.search(r'image source="([^"]+)"', text)
+        return _norm(tsx_path.parent / m.group(1)).as_posix() if m else None
+
+    # ---------- folder listings ----------
+    def _listing(self, folder: Path) -> FrozenSet[str]:
+        entry = self._dirs.get(folder)
+        if entry is None:
+            entry = self._scan(folder)
+        return entry[1]
+
+    def _scan(self, folder: Path) -> Tuple[int | None, FrozenSet[str]]:
+        try:
+            mtime = os.stat(folder).st_mtime_ns
+        except OSError:
+            mtime = None
+        saved = self._saved.get("dirs", {}).get(folder.as_posix())
+        if saved is not None and saved["mtime_ns"] == mtime:
+            names = frozenset(saved["files"])
+        else:
+            try:
+                names = frozenset(os.listdir(folder))
+            except OSError:
+                names = frozenset()
+            self._dirty = True
+        with self._lock:
+            self._dirs[folder] = (mtime, names)
+        return mtime, names
+
+    def refresh(self) -> None:
+        """Re-list folders whose mtime changed and drop memoized resolutions."""
+        for folder, (mtime, _) in list(self._dirs.items()):
+            try:
+                current = os.stat(folder).st_mtime_ns
+            except OSError:
+                current = None
+            if current != mtime:
+                self._dirs.pop(folder, None)
+                self._scan(folder)
+        with self._lock:
+            self._resolved.clear()
+            self._exists.clear()
+            self._tsx_checked.clear()
+        self.save()
+
+    # ---------- manifest ----------
+    def _read_manifest(self) -> Dict[str, dict]:
+        if self.manifest is None or not self.manifest.exists():
+            return {}
+        try:
+            blob = json.loads(self.manifest.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        return blob if blob.get("version") == MANIFEST_VERSION else {}
+
+    def _saved_tsx(self, key: str) -> Tuple[int | None, str | None] | None:
+        saved = self._saved.get("tsx", {}).get(key)
+        return (saved["mtime_ns"], saved["image"]) if saved else None
+
+    def _blob(self) -> dict:
+        return {
+            "version": MANIFEST_VERSION,
+            "dirs": {p.as_posix(): {"mtime_ns": m, "files": sorted(names)} for p, (m, names) in self._dirs.items()},
+            "tsx": {k: {"mtime_ns": m, "image": img} for k, (m, img) in self._tsx.items()},
+        }
+
+    def export(self) -> dict:
+        """Listings and TSX results in manifest form (see absorb())."""
+        with self._lock:
+            return self._blob()
+
+    def absorb(self, blob: dict) -> None:
+        """Take over listings/TSX results another index exported (e.g. from a
+        read-only bake worker) that this one lacks or has older, so a single
+        process can persist them."""
+        with self._lock:
+            for folder, entry in blob.get("dirs", {}).items():
+                key = Path(folder)
+                if key not in self._dirs or self._dirs[key][0] != entry["mtime_ns"]:
+                    self._dirs[key] = (entry["mtime_ns"], frozenset(entry["files"]))
+                    self._dirty = True
+            for tsx, entry in blob.get("tsx", {}).items():
+                cached = (entry["mtime_ns"], entry["image"])
+                if self._tsx.get(tsx) != cached:
+                    self._tsx[tsx] = cached
+                    self._dirty = True
+
+    def save(self) -> None:
+        """Persist listings/TSX results if anything changed. Each write goes to
+        its own temp file and is swapped in atomically, so concurrent savers
+        (game thread, room prefetcher) never leave a torn manifest."""
+        if self.manifest is None or self.read_only or not self._dirty:
+            return
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                blob = self._blob()
+                self._dirty = False
+            # one temp file per process (the lock covers this one's threads);
+            # written like any other cache file, so it keeps the umask's mode
+            tmp = self.manifest.with_suffix(f".{os.getpid()}.tmp")
+            try:
+                self.manifest.parent.mkdir(parents=True, exist_ok=True)
+                tmp.write_text(json.dumps(blob), encoding="utf-8")
+                os.replace(tmp, self.manifest)
+                self._saved = blob
+            except OSError:
+                self._dirty = True  # try again on the next save
+                try:
+                    tmp.unlink()
+                except OSError:
+                    pass
@@ -9,6 +9,7 @@ from pathlib import Path
 from typing import Dict, List, Tuple
 import pygame
 
+import collision
 from constants import TILE
 try:
     from constants import BOSS_ATTACK_DAMAGE
@@ -66,6 +67,7 @@ class Boss:
         self.rect = pygame.Rect(0, 0, self.w, self.h)
         self.rect.midbottom = (int(self.pos.x), int(self.pos.y) + self.offset_y)
         self.hitbox = self.rect.inflate(-self.w // 4, -self.h // 4)
+        self._heading = None  # (room steering, block being walked to)
 
         # stats
         self.max_hp = 20
@@ -103,11 +105,66 @@ class Boss:
             self.timer -= step
             self.frame = (self.frame + 1) % len(frames)
 
-    def _move_towards(self, target: pygame.Vector2, solids: List[pygame.Rect], dt: float):
+    @staticmethod
+    def _nearby_solids(room, rect: pygame.Rect) -> List[pygame.Rect]:
+        if hasattr(room, "query_solids"):
+            return room.query_solids(rect)
+        return room.solid_rects()
+
+    def _block(self, pos, walk):
+        """Free block (top-left tile of size_tiles x size_tiles) nearest `pos`
+        on the room's block grid `walk`, or None."""
+        n = self.size_tiles
+        bx = (int(pos[0]) - n * TILE // 2 + TILE // 2) // TILE
+        by = (int(pos[1]) - n * TILE // 2 + TILE // 2) // TILE
+        near = sorted(((bx + dx, by + dy) for dy in (-1, 0, 1) for dx in (-1, 0, 1)),
+                      key=lambda c: ((c[0] + n / 2) * TILE - pos[0]) ** 2 + ((c[1] + n / 2) * TILE - pos[1]) ** 2)
+        for x, y in near:
+            if 0 <= x < walk.shape[1] and 0 <= y < walk.shape[0] and walk[y, x]:
+                return x, y
+        return None
+
+    def _waypoint(self, target: pygame.Vector2, room) -> pygame.Vector2:
+        """Centre of the block to walk to next towards `target` around walls,
+        from the room's steering (a JPS path, or the shared flow field in a
+        crowded room); the target itself once in its block (or if the room has
+        no tile grid / it can't be reached). A block is only left for the next
+        one once the hitbox is near its centre, where it clears the block's walls."""
+        if not hasattr(room, "steering"):
+            return target
+        steer = room.steering(self.size_tiles)
+        goal = self._block(target, steer.walk)
+        heading = self._heading[1] if self._heading and self._heading[0] is steer else None
+        block = heading or self._block(self.hitbox.center, steer.walk)
+        if goal is None or block is None:
+            self._heading = None
+            return target
+        half = self.size_tiles * TILE / 2
+        slack = half - max(self.hitbox.w, self.hitbox.h) / 2
+        centre = pygame.Vector2(block[0] * TILE + half, block[1] * TILE + half)
+        off = centre - pygame.Vector2(self.hitbox.center)
+        if max(abs(off.x), abs(off.y)) > slack:
+            self._heading = (steer, block)
+            return centre
+        step = steer.next_step(block, goal)  # cached until the target changes block
+        if step is None:
+            self._heading = None
+            return target
+        self._heading = (steer, step)
+        return pygame.Vector2(step[0] * TILE + half, step[1] * TILE + half)
+
+    def _move_towards(self, target: pygame.Vector2, room, dt: float):
+        target = self._waypoint(target, room)
         vec = target - pygame.Vector2(self.hitbox.center)
         if vec.length_squared() > 0:
             vec.scale_to_length(self.speed * dt)
-        # axis separated collision
+        if collision.uses_grid(room):
+            collision.move_axis(self.hitbox, vec.x, 0, room)
+            collision.move_axis(self.hitbox, 0, vec.y, room)
+            self.rect.center = self.hitbox.center
+            return
+        # axis separated collision (only against solids near the swept hitbox)
+        solids = self._nearby_solids(room, self.hitbox.union(self.hitbox.move(int(vec.x), 0)))
         self.hitbox.x += int(vec.x)
         for s in solids:
             if self.hitbox.colliderect(s):
@@ -115,6 +172,7 @@ class Boss:
                     self.hitbox.right = s.left
                 elif vec.x < 0:
                     self.hitbox.left = s.right
+        solids = self._nearby_solids(room, self.hitbox.union(self.hitbox.move(0, int(vec.y))))
         self.hitbox.y += int(vec.y)
         for s in solids:
             if self.hitbox.colliderect(s):
@@ -151,7 +209,7 @@ class Boss:
                 self._attack_time = self.attack_anim_length
             elif dist <= self.notice_radius:
                 self._set_state("move")
-                self._move_towards(player_center, room.solid_rects(), dt)
+                self._move_towards(player_center, room, dt)
             else:
                 self._set_state("idle")
 
@@ -0,0 +1,137 @@
+"""Tile-grid collision backend: per-room blocked-tile grid + swept AABB moves.
+
+The default backend resolves movement against Room.solid_rects() (or the
+spatial index). With COLLISION_BACKEND = "grid", Player and Boss instead move
+through move_axis(), which walks only the tile columns/rows the hitbox's
+leading edge crosses. Cost is O(tiles crossed), and because every crossed tile
+is checked a fast move (e.g. knockback on a long frame) can't skip a wall.
+
+Object-layer and dynamic solids aren't tile-aligned, so they stay rects
+("loose" solids) and are swept the same way.
+"""
+from __future__ import annotations
+from typing import Iterable, Tuple
+
+import numpy as np
+import pygame
+
+from constants import TILE
+
+try:
+    from constants import COLLISION_BACKEND
+except Exception:
+    COLLISION_BACKEND = "rects"
+
+
+class WalkGrid:
+    """Boolean blocked-tile grid (row-major, tile (0, 0) at pixel (0, 0)).
+
+    Tiles outside the grid are open, like the area outside a room's solids.
+    """
+
+    def __init__(self, blocked: np.ndarray, tile: int = TILE):
+        self.blocked = np.asarray(blocked, dtype=bool)
+        self.tile = tile
+        self.h, self.w = self.blocked.shape
+        # bytes rows/columns: scalar lookups are much cheaper than ndarray indexing
+        cells = self.blocked.astype(np.uint8)
+        self._rows = [row.tobytes() for row in cells]
+        self._cols = [col.tobytes() for col in cells.T]
+
+    @property
+    def walk(self) -> np.ndarray:
+        return ~self.blocked
+
+    def blocked_at(self, tx: int, ty: int) -> bool:
+        return 0 <= tx < self.w and 0 <= ty < self.h and bool(self._rows[ty][tx])
+
+    def rect_collides(self, rect: pygame.Rect) -> bool:
+        """True if `rect` overlaps any blocked tile."""
+        t = self.tile
+        x0, x1 = max(0, rect.left // t), min(self.w, (rect.right - 1) // t + 1)
+        y0, y1 = max(0, rect.top // t), min(self.h, (rect.bottom - 1) // t + 1)
+        return x0 < x1 and y0 < y1 and bool(self.blocked[y0:y1, x0:x1].any())
+
+    def sweep_x(self, rect: pygame.Rect, d: int) -> int:
+        """How far (<= |d| px, same sign) `rect` can move along x before a blocked tile."""
+        return self._sweep(self._cols, self.w, rect.left, rect.right, rect.top, rect.bottom, self.h, d)
+
+    def sweep_y(self, rect: pygame.Rect, d: int) -> int:
+        return self._sweep(self._rows, self.h, rect.top, rect.bottom, rect.left, rect.right, self.w, d)
+
+    def _sweep(self, lines, n_lines: int, lo: int, hi: int, a0: int, a1: int, n_across: int, d: int) -> int:
+        # lines[i] = blocked bytes of the i-th tile line perpendicular to the move;
+        # [lo, hi) is the rect's extent along the move, [a0, a1) across it.
+        t = self.tile
+        if d > 0:
+            # lines newly entered by the leading edge, nearest first
+            first, stop, step = (hi - 1) // t + 1, (hi + d - 1) // t + 1, 1
+            if stop > n_lines:
+                stop = n_lines
+        elif d < 0:
+            first, stop, step = lo // t - 1, (lo + d) // t - 1, -1
+            if first >= n_lines:
+                first = n_lines - 1
+            if stop < -1:
+                stop = -1
+        else:
+            return d
+        if (first >= stop) if step > 0 else (first <= stop):
+            return d  # still inside the lines it already overlaps: nothing new to test
+        c0, c1 = a0 // t, (a1 - 1) // t + 1
+        if c0 < 0:
+            c0 = 0
+        if c1 > n_across:
+            c1 = n_across
+        if c0 >= c1:
+            return d
+        for i in range(first, stop, step):
+            if 1 in lines[i][c0:c1]:
+                return i * t - hi if step > 0 else (i + 1) * t - lo
+        return d
+
+
+def sweep_rects(rect: pygame.Rect, dx: int, dy: int, solids: Iterable[pygame.Rect]) -> int:
+    """Clamp a one-axis move of `rect` by (dx, 0) or (0, dy) against rects ahead of it."""
+    if dx:
+        d = dx
+        for s in solids:
+            if s.top < rect.bottom and s.bottom > rect.top:
+                if d > 0 and rect.right <= s.left < rect.right + d:
+                    d = s.left - rect.right
+                elif d < 0 and rect.left + d < s.right <= rect.left:
+                    d = s.right - rect.left
+        return d
+    d = dy
+    for s in solids:
+        if s.left < rect.right and s.right > rect.left:
+            if d > 0 and rect.bottom <= s.top < rect.bottom + d:
+                d = s.top - rect.bottom
+            elif d < 0 and rect.top + d < s.bottom <= rect.top:
+                d = s.bottom - rect.top
+    return d
+
+
+def uses_grid(room) -> bool:
+    """Whether movement in `room` should go through the tile-grid backend."""
+    return COLLISION_BACKEND == "grid" and getattr(room, "walk_grid", None) is not None
+
+
+def move_axis(rect: pygame.Rect, dx: float, dy: float, room, offset: Tuple[int, int] = (0, 0)) -> bool:
+    """Move `rect` in place by int(dx) or int(dy) (one axis), stopping at walls.
+
+    `offset` follows Room.solid_rects: `rect` is in world coords shifted by
+    -offset. Returns True if the move was cut short.
+    """
+    world = rect.move(offset) if offset and offset != (0, 0) else rect
+    grid = room.walk_grid
+    loose = room.loose_rects()
+    if dx:
+        want = int(dx)
+        d = sweep_rects(world, grid.sweep_x(world, want), 0, loose)
+        rect.x += d
+    else:
+        want = int(dy)
+        d = sweep_rects(world, 0, grid.sweep_y(world, want), loose)
+        rect.y += d
+    return d != want
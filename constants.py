@@ -3,6 +3,27 @@ SCREEN_W, SCREEN_H = 1280, 720
 FPS = 60
 ANIM_FPS = 8
 
+# --- asset caches ---
+ATLAS_BUDGET_MB = 64      # decoded tileset atlases kept resident across room loads
+PREFETCH_MAX_ROOMS = 6    # ready neighbour rooms kept by the background prefetcher
+PREFETCH_BUDGET_MB = 96   # ...and the pixel memory they may hold
+STREAM_CHUNK_TILES = 16   # big/infinite maps are drawn from 16x16-tile chunk surfaces
+STREAM_MAX_CHUNKS = 48    # ...of which at most this many stay resident (LRU)
+
+# --- map hot reload ---
+MAP_POLL_SECONDS = 0.5    # how often the game checks maps/ for saved edits (0 = off)
+
+# --- path queries ---
+SEARCH_CACHE_SIZE = 1024  # memoized (start, goal, algorithm) search results
+DOOR_STEP_COST = 1        # tiles a walk through a door to the next room counts as (hpa.py)
+PATH_CACHE_SIZE = 256     # in-room tile paths cached per room (tile_nav.GridPathfinder)
+FLOW_FIELD_RADIUS = 32    # tiles around the chased tile a flow field covers (flow_field.py)
+FLOW_FIELD_MIN_CHASERS = 8  # rooms with this many chasers share a flow field instead of JPS paths (room_map.py)
+UCS_ENGINE = "heap"       # default UCS search: "heap", "bidirectional" or "bucket" (UCS/ucs_new.py)
+
+# --- collision ---
+COLLISION_BACKEND = "rects"  # "rects": solid rect lists; "grid": swept AABB over the tile grid (collision.py)
+
 # --- world scale ---
 TILE = 32                 # tile size used by your art & Tiled rooms
 PLAYER_SPEED = 140        # pixels per second
@@ -0,0 +1,241 @@
+"""Incremental replanning over a graph_core.RoomGraph (D* Lite).
+
+A_star_graph / UCSGraph answer one query and forget everything, so changing
+a room's danger (a trap revealed, a boss beaten) used to mean searching
+again from scratch. DStarLite searches backwards from the goal, keeps its
+g/rhs values between queries, and when a danger or door cost changes it only
+re-expands the rooms whose cost to the goal actually moved (Koenig &
+Likhachev's D* Lite, optimized version). The start may move too.
+
+Cost model as everywhere else: stepping u -> v costs danger[v] + the door's
+cost. Costs are changed through set_danger / set_edge_cost, which write the
+new values into the graph's arrays as well, so other readers of the same
+RoomGraph (GoalTable, the other searches) see them, and bump the graph
+version so answers cached from the old costs (SEARCH_CACHE, the UCS bucket
+engine's step costs) are dropped.
+"""
+from __future__ import annotations
+import heapq
+from math import hypot, inf
+from typing import List, Tuple
+
+import numpy as np
+
+from graph_core import RoomGraph
+from search_cache import bump_graph_version
+
+
+class DStarLite:
+    """Cheapest start -> goal route that survives cost changes.
+
+    The heuristic is the straight-line distance between room coordinates,
+    scaled down so that no door costs less than it claims (graphs without
+    coordinates get h = 0 and it behaves like an incremental Dijkstra).
+    Dangers must stay >= 0; a door made cheaper than the scale allows
+    restarts the search with a new scale.
+    """
+
+    def __init__(self, graph: RoomGraph, start, goal):
+        self.graph = graph
+        self.start = graph.index_of(start)
+        self.goal = graph.index_of(goal)
+        self.expanded = 0  # rooms expanded so far, for benchmarks
+        # reverse CSR: edges into each room, as forward edge slots
+        into = np.argsort(graph.neighbors, kind="stable")
+        r_off = np.zeros(len(graph) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(graph.neighbors, minlength=len(graph)), out=r_off[1:])
+        self._r_off, self._into = memoryview(r_off), memoryview(into)
+        self._src = memoryview(graph.edge_sources())
+        # views share the graph's buffers, so cost writes show up in them too
+        self._off, self._nb = memoryview(graph.offsets), memoryview(graph.neighbors)
+        self._danger, self._costs = memoryview(graph.danger), memoryview(graph.costs)
+        self._x, self._y = memoryview(graph.x), memoryview(graph.y)
+        self._reset()
+
+    # ---------- state ----------
+    def _reset(self) -> None:
+        """Forget everything and start over (also picks a new heuristic scale)."""
+        n = len(self.graph)
+        self._g_arr = np.full(n, inf)
+        self._rhs_arr = np.full(n, inf)
+        self._g, self._rhs = memoryview(self._g_arr), memoryview(self._rhs_arr)
+        self._h_scale = self._heuristic_scale()
+        self._km = 0.0
+        self._last = self.start
+        self._heap: List[Tuple[float, float, int]] = []
+        self._queued = {}  # room -> its current key (heap entries with another key are stale)
+        self._rhs[self.goal] = 0.0
+        self._push(self.goal)
+
+    def _heuristic_scale(self) -> float:
+        g = self.graph
+        src = np.asarray(self._src)
+        dist = np.hypot(g.x[src] - g.x[g.neighbors], g.y[src] - g.y[g.neighbors])
+        moving = dist > 0
+        if not moving.any():
+            return 0.0
+        # door costs only, so any danger change (>= 0) keeps the heuristic admissible
+        return float(min(1.0, max(0.0, (g.costs[moving] / dist[moving]).min())))
+
+    def _h(self, u: int) -> float:
+        x, y, s = self._x, self._y, self.start
+        return self._h_scale * hypot(x[u] - x[s], y[u] - y[s]) if self._h_scale else 0.0
+
+    def _key(self, u: int) -> Tuple[float, float]:
+        m = min(self._g[u], self._rhs[u])
+        return m + self._h(u) + self._km, m
+
+    def _push(self, u: int) -> None:
+        k1, k2 = self._queued[u] = self._key(u)
+        heapq.heappush(self._heap, (k1, k2, u))
+
+    def _top(self):
+        heap, queued = self._heap, self._queued
+        while heap:
+            k1, k2, u = heap[0]
+            if queued.get(u) == (k1, k2):
+                return k1, k2, u
+            heapq.heappop(heap)
+        return None
+
+    def _best_rhs(self, u: int) -> float:
+        g, danger, costs, neighbors = self._g, self._danger, self._costs, self._nb
+        best = inf
+        for e in range(self._off[u], self._off[u + 1]):
+            v = neighbors[e]
+            cand = danger[v] + costs[e] + g[v]
+            if cand < best:
+                best = cand
+        return best
+
+    def _update(self, u: int) -> None:
+        if self._g[u] != self._rhs[u]:
+            self._push(u)
+        else:
+            self._queued.pop(u, None)
+
+    # ---------- search ----------
+    def _compute(self) -> None:
+        g, rhs, queued, heap = self._g, self._rhs, self._queued, self._heap
+        r_off, into, src = self._r_off, self._into, self._src
+        danger, costs = self._danger, self._costs
+        s, goal = self.start, self.goal
+        while True:
+            top = self._top()
+            if top is None:
+                break
+            k_old = top[:2]
+            if k_old >= self._key(s) and rhs[s] == g[s]:
+                break
+            u = top[2]
+            k_new = self._key(u)
+            if k_old < k_new:
+                self._push(u)
+                continue
+            heapq.heappop(heap)
+            del queued[u]
+            self.expanded += 1
+            if g[u] > rhs[u]:
+                g[u] = rhs[u]
+                step = danger[u]
+                for k in range(r_off[u], r_off[u + 1]):
+                    e = into[k]
+                    p = src[e]
+                    cand = step + costs[e] + g[u]
+                    if p != goal and cand < rhs[p]:
+                        rhs[p] = cand
+                        self._update(p)
+            else:
+                g_old = g[u]
+                g[u] = inf
+                step = danger[u]
+                for k in range(r_off[u], r_off[u + 1]):
+                    e = into[k]
+                    p = src[e]
+                    if p != goal and rhs[p] == step + costs[e] + g_old:
+                        rhs[p] = self._best_rhs(p)
+                    self._update(p)
+                self._update(u)
+
+    def search(self) -> Tuple[float, List[int]]:
+        """(cost, [room index, ...]) from start to goal, like A_star_graph.search();
+        only re-expands what changed since the last call."""
+        self._compute()
+        return self.route()
+
+    def route(self) -> Tuple[float, List[int]]:
+        """Follow the cheapest doors from start (call search() first after changes).
+        The cost is summed along the route in the order a forward search adds it."""
+        u = self.start
+        if self._g[u] == inf:
+            return float("inf"), []
+        g, offsets, neighbors = self._g, self._off, self._nb
+        danger, costs = self._danger, self._costs
+        path, cost = [u], 0
+        while u != self.goal:
+            if len(path) > len(self.graph):
+                return float("inf"), []
+            best, via = inf, -1
+            for e in range(offsets[u], offsets[u + 1]):
+                cand = danger[neighbors[e]] + costs[e] + g[neighbors[e]]
+                if cand < best:
+                    best, via = cand, e
+            if via < 0:
+                return float("inf"), []
+            u = neighbors[via]
+            cost = cost + danger[u] + costs[via]
+            path.append(u)
+        return cost, path
+
+    # ---------- changes ----------
+    def set_start(self, room) -> None:
+        """Search from another room (e.g. where the player now is)."""
+        self.start = self.graph.index_of(room)
+        if self._h_scale:
+            x, y = self._x, self._y
+            self._km += self._h_scale * hypot(x[self._last] - x[self.start], y[self._last] - y[self.start])
+        self._last = self.start
+
+    def set_danger(self, room, danger: float) -> None:
+        """Change the cost of stepping into `room` (every door leading to it)."""
+        v = self.graph.index_of(room)
+        old = self._danger[v]
+        if old == danger:
+            return
+        self._danger[v] = danger
+        bump_graph_version()
+        danger, costs = self._danger[v], self._costs
+        edges = [self._into[k] for k in range(self._r_off[v], self._r_off[v + 1])]
+        self._edges_changed([(self._src[e], v, old + costs[e], danger + costs[e]) for e in edges])
+
+    def set_edge_cost(self, room_a, room_b, cost: float) -> None:
+        """Change the cost of every door from room_a to room_b."""
+        u, v = self.graph.index_of(room_a), self.graph.index_of(room_b)
+        costs, danger = self._costs, self._danger[v]
+        changed = []
+        for e in range(self._off[u], self._off[u + 1]):
+            if self._nb[e] == v and costs[e] != cost:
+                old = costs[e]
+                costs[e] = cost
+                changed.append((u, v, danger + old, danger + costs[e]))
+        if changed:
+            bump_graph_version()
+        self._edges_changed(changed)
+
+    def _edges_changed(self, changed) -> None:
+        """Repair rhs of the rooms whose door (u -> v) went from step c_old to c_new."""
+        if not changed:
+            return
+        x, y = self._x, self._y
+        if any(c_new < self._h_scale * hypot(x[u] - x[v], y[u] - y[v]) for u, v, _, c_new in changed):
+            self._reset()  # heuristic no longer admissible for this door: rescale
+            return
+        g, rhs = self._g, self._rhs
+        for u, v, c_old, c_new in changed:
+            if u == self.goal:
+                continue
+            if c_new < c_old:
+                rhs[u] = min(rhs[u], c_new + g[v])
+            elif rhs[u] == c_old + g[v]:
+                rhs[u] = self._best_rhs(u)
+            self._update(u)
@@ -0,0 +1,148 @@
+"""Flow fields: one shared route to a single goal for every chaser in a room.
+
+A GridPathfinder query per monster per frame stops scaling once a room holds
+dozens of chasers all running at the player. A FlowField instead integrates
+the cost from the goal to every tile within FLOW_FIELD_RADIUS of it (octile
+steps, no corner cutting, same rules as GridPathfinder) and stores the best
+next step of each tile, so a chaser's move is one array lookup however many
+of them there are. The field is only recomputed when the goal tile changes.
+
+Integration is a vectorized Bellman-Ford: every sweep relaxes all tiles
+against each of their 8 neighbours in turn (shifted numpy views, updated in
+place) until nothing improves, which takes at most as many sweeps as the
+longest route in the window has steps.
+"""
+from __future__ import annotations
+from math import inf
+from typing import List, Tuple
+
+import numpy as np
+
+from tile_nav import DIRS, SQRT2, Cell
+
+try:
+    from constants import FLOW_FIELD_RADIUS
+except Exception:
+    FLOW_FIELD_RADIUS = 32
+
+
+class FlowField:
+    """Next-step field towards one goal tile over a walkable grid.
+
+    `weights` (optional, per tile) scales the cost of entering a tile, as in
+    GridPathfinder. Tiles farther than `radius` from the goal (Chebyshev) are
+    outside the window and get no direction.
+    """
+
+    def __init__(self, walk: np.ndarray, weights: np.ndarray | None = None, radius: int = FLOW_FIELD_RADIUS):
+        self.walk = np.asarray(walk, dtype=bool)
+        self.h, self.w = self.walk.shape
+        self.weights = None if weights is None else np.asarray(weights, dtype=np.float64)
+        self.radius = max(1, radius)
+        self.goal: Cell | None = None
+        self.origin: Cell = (0, 0)                   # window's top-left tile
+        self.cost = np.empty((0, 0))                 # cost to the goal over the window (inf: unreachable)
+        self.step = np.empty((0, 0), dtype=np.int8)  # index into DIRS of the best move, -1 for none
+        self.recomputes = 0
+        self.sweeps = 0
+
+    # ---------- queries ----------
+    def retarget(self, goal: Cell) -> bool:
+        """Point the field at `goal`; recomputes only if it moved. True if it did."""
+        goal = (int(goal[0]), int(goal[1]))
+        if goal == self.goal:
+            return False
+        self.goal = goal
+        self._integrate()
+        self.recomputes += 1
+        return True
+
+    def next_cell(self, cell: Cell) -> Cell | None:
+        """Tile to step to from `cell` towards the goal; None at the goal,
+        outside the window or where the goal can't be reached."""
+        x, y = cell[0] - self.origin[0], cell[1] - self.origin[1]
+        if not (0 <= y < self.step.shape[0] and 0 <= x < self.step.shape[1]):
+            return None
+        d = self.step[y, x]
+        if d < 0:
+            return None
+        return cell[0] + DIRS[d][0], cell[1] + DIRS[d][1]
+
+    def next_step(self, cell: Cell, goal: Cell) -> Cell | None:
+        """next_cell(cell) with the field pointed at `goal` (same contract as
+        GridPathfinder.next_step)."""
+        self.retarget(goal)
+        return self.next_cell(cell)
+
+    def direction(self, cell: Cell) -> Tuple[int, int]:
+        """(dx, dy) of the step from `cell`, (0, 0) if there is none."""
+        nxt = self.next_cell(cell)
+        return (0, 0) if nxt is None else (nxt[0] - cell[0], nxt[1] - cell[1])
+
+    def distance(self, cell: Cell) -> float:
+        x, y = cell[0] - self.origin[0], cell[1] - self.origin[1]
+        if not (0 <= y < self.cost.shape[0] and 0 <= x < self.cost.shape[1]):
+            return inf
+        return float(self.cost[y, x])
+
+    # ---------- integration ----------
+    def _integrate(self) -> None:
+        gx, gy = self.goal
+        r = self.radius
+        x0, y0 = max(0, gx - r), max(0, gy - r)
+        x1, y1 = min(self.w, gx + r + 1), min(self.h, gy + r + 1)
+        self.origin = (x0, y0)
+        if x0 >= x1 or y0 >= y1:
+            self.cost = np.empty((0, 0))
+            self.step = np.empty((0, 0), dtype=np.int8)
+            return
+        h, w = y1 - y0, x1 - x0
+        # padded with a closed border so every shifted view stays in bounds
+        open_p = np.zeros((h + 2, w + 2), dtype=bool)
+        open_p[1:-1, 1:-1] = self.walk[y0:y1, x0:x1]
+        open_p[gy - y0 + 1, gx - x0 + 1] = True  # the goal needn't be walkable (player brushing a wall)
+        weight_p = None
+        if self.weights is not None:
+            weight_p = np.ones((h + 2, w + 2))
+            weight_p[1:-1, 1:-1] = self.weights[y0:y1, x0:x1]
+
+        def shifted(a, dx, dy):
+            return a[1 + dy: 1 + dy + h, 1 + dx: 1 + dx + w]
+
+        inner = open_p[1:-1, 1:-1]
+        moves: List[Tuple[int, int, np.ndarray]] = []  # (dx, dy, step cost; inf where the move is blocked)
+        for dx, dy in DIRS:
+            ok = inner & shifted(open_p, dx, dy)
+            if dx and dy:
+                ok &= shifted(open_p, dx, 0) & shifted(open_p, 0, dy)
+            length = SQRT2 if dx and dy else 1.0
+            if weight_p is not None:
+                length = length * shifted(weight_p, dx, dy)
+            moves.append((dx, dy, np.where(ok, length, inf)))
+
+        cost_p = np.full((h + 2, w + 2), inf)
+        cost = cost_p[1:-1, 1:-1]
+        cost[gy - y0, gx - x0] = 0.0
+        cand = np.empty((h, w))
+        before = np.empty((h, w))
+        while True:
+            before[...] = cost
+            for dx, dy, step_cost in moves:
+                np.add(shifted(cost_p, dx, dy), step_cost, out=cand)
+                np.minimum(cost, cand, out=cost)
+            self.sweeps += 1
+            if np.array_equal(before, cost):
+                break
+
+        # best move of every tile: the neighbour it was relaxed through
+        best = np.full((h, w), inf)
+        step = np.full((h, w), -1, dtype=np.int8)
+        for d, (dx, dy, step_cost) in enumerate(moves):
+            np.add(shifted(cost_p, dx, dy), step_cost, out=cand)
+            better = cand < best
+            best[better] = cand[better]
+            step[better] = d
+        step[gy - y0, gx - x0] = -1
+        step[np.isinf(cost)] = -1
+        self.cost = cost.copy()
+        self.step = step
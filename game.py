@@ -5,13 +5,25 @@ from typing import List, Tuple
 import pygame
 from constants import SCREEN_W, SCREEN_H, FPS, TILE, HAZARD_DAMAGE, HAZARD_TICK_SECONDS
 from room_map import RoomMap
+from room_index import RoomIndex
+from room_prefetch import RoomPrefetcher
 from player import Player
 
 from UCS import ucs_new
 import A_star
+from graph_core import GoalTable, RoomGraph
+from dstar_lite import DStarLite
+from hpa import HierarchicalPlanner, WalkRoute
+from tile_nav import room_walkable
+from search_cache import SEARCH_CACHE, bump_graph_version, graph_version
 
 from boss import Boss
 
+try:
+    from constants import MAP_POLL_SECONDS
+except Exception:
+    MAP_POLL_SECONDS = 0.5
+
 
 
 class TextBox:
@@ -122,6 +134,8 @@ class Game:
             self.rooms.append("room12.json")
         self.cur = 0
         self.room = self.map.load_json_room(self.rooms[self.cur])
+        # door counts/cells for graph validation, without rendering any room
+        self.room_index = RoomIndex(map_dir).build(self.rooms)
         
         sx, sy = self.room.get_spawn_point()
         self.player = Player((sx, sy))
@@ -238,11 +252,7 @@ class Game:
                 # non-existent index. If the dst room isn't loadable or has no
                 # doors, fall back to index 0. Otherwise prefer the declared dst_i
                 # if it's in range, else pick a free index in the dst room.
-                try:
-                    dst_room = self.map.load_json_room(dst)
-                    dst_count = len(dst_room.door_cells)
-                except Exception:
-                    dst_count = 0
+                dst_count = self.room_index.door_count(dst)
 
                 if dst_count <= 0:
                     valid_dst_i = 0
@@ -340,16 +350,7 @@ class Game:
             if src in self.shared_nodes:
                 for local_idx, (dst, _) in mappings.items():
                     if dst in self.shared_nodes:
-                        src_node = self.shared_nodes[src]
-                        dst_node = self.shared_nodes[dst]
-
-                        # Edge cost = Euclidean distance
-                        edge_cost = round(((src_node.x - dst_node.x)**2 + (src_node.y - dst_node.y)**2)**0.5, 2)
-
-                        # Alternatively: Manhattan distance
-                        # edge_cost = abs(src_node.x - dst_node.x) + abs(src_node.y - dst_node.y)
-
-                        self.shared_nodes[src].add_door(f"door_{local_idx}", dst_node, cost=edge_cost)
+                        self._add_graph_door(src, local_idx, dst)
 
         # Decide start and goal
         start_node_name = room_json
@@ -367,6 +368,16 @@ class Game:
                 print(f"{room_name} -> {neighbor.name} | Door: {door_name} | Edge Cost: {cost:.2f} | Danger: {neighbor.danger_cost}")
         print("")
 
+        # the same graph as flat CSR arrays (graph_core) for array-based searches,
+        # plus the cost/next-door table towards the goal and the incremental
+        # start -> goal route (dstar_lite) the panels read (both lazy)
+        self.room_graph = RoomGraph.from_nodes(self.shared_nodes)
+        self._goal_table = None
+        self._route_engine = None
+        self._hpa = None  # door-level walking planner (hpa), built on first use
+        self._graph_version = graph_version()
+        self.search_cache = SEARCH_CACHE  # hit/miss counters: self.search_cache.stats()
+
         # ---------------- UCS Integration ----------------
         self.ucs_nodes = self.shared_nodes
         self.ucs_game = ucs_new.UCSGame(self.ucs_nodes, start_node_name, goal_node_name)
@@ -377,16 +388,9 @@ class Game:
         print("Path:", [n.name for n in ucs_path])
 
         # ---------------- A* Integration ----------------
-        # Copy nodes for A* so coordinates & heuristics are independent
-        self.astar_nodes = {}
-        for name, node in self.shared_nodes.items():
-            new_node = A_star.Node(name, node.danger_cost, trap=node.trap, x=node.x, y=node.y)
-            new_node.doors = node.doors.copy()  # copy edges
-            self.astar_nodes[name] = new_node
-
-        for name, node in self.shared_nodes.items():
-            for door_name, (neighbor, cost) in node.doors.items():
-                self.astar_nodes[name].add_door(door_name, self.astar_nodes[neighbor.name], cost)
+        # shared_nodes are A_star.Node already (with coordinates); A* stores its
+        # heuristic on them, which UCS ignores, so both share one node set
+        self.astar_nodes = self.shared_nodes
 
         # Run A*
         self.a_star_game = A_star.A_star_game(self.astar_nodes, start_node_name, goal_node_name)
@@ -399,8 +403,13 @@ class Game:
             print(f"{n.name} | Coord: ({n.x},{n.y}) | Heuristic: {n.heuristic:.2f} | Danger: {n.danger_cost}")
 
 
+        # Load the rooms behind the current room's doors in the background
+        self.prefetcher = RoomPrefetcher(self.map)
+        self._prefetch_neighbours()
+
         # Misc gameplay state
         self._hazard_tick_accum = 0.0
+        self._map_poll_accum = 0.0
         self.game_over = False
         self.show_door_ids = True
         self.win_screen = False
@@ -481,7 +490,14 @@ class Game:
     @property
     def offset(self) -> Tuple[int,int]:
         rw, rh = self.room.pixel_size
-        return (SCREEN_W - rw)//2, (SCREEN_H - rh)//2
+        ox, oy = (SCREEN_W - rw)//2, (SCREEN_H - rh)//2
+        # rooms bigger than the screen: follow the player, clamped to the room edges
+        px, py = self.player.rect.center
+        if rw > SCREEN_W:
+            ox = max(SCREEN_W - rw, min(0, SCREEN_W//2 - px))
+        if rh > SCREEN_H:
+            oy = max(SCREEN_H - rh, min(0, SCREEN_H//2 - py))
+        return ox, oy
 
     # ------------- door graph helpers -------------
     def connect_doors(self, room_a: str, idx_a: int, room_b: str, idx_b: int, two_way: bool=True):
@@ -491,6 +507,113 @@ class Game:
             b = self.door_graph.setdefault(room_b, {})
             b[idx_b] = (room_a, idx_a)
         self._verify_door_graph()
+        self._hpa = None
+        bump_graph_version()
+        # keep the pathfinding graph in step with the doors
+        nodes = getattr(self, "shared_nodes", {})
+        if room_a in nodes and room_b in nodes:
+            self._add_graph_door(room_a, idx_a, room_b)
+            if two_way:
+                self._add_graph_door(room_b, idx_b, room_a)
+            self._graph_changed()
+
+    def _add_graph_door(self, src: str, local_idx: int, dst: str):
+        src_node = self.shared_nodes[src]
+        dst_node = self.shared_nodes[dst]
+
+        # Edge cost = Euclidean distance
+        edge_cost = round(((src_node.x - dst_node.x)**2 + (src_node.y - dst_node.y)**2)**0.5, 2)
+
+        # Alternatively: Manhattan distance
+        # edge_cost = abs(src_node.x - dst_node.x) + abs(src_node.y - dst_node.y)
+
+        src_node.add_door(f"door_{local_idx}", dst_node, cost=edge_cost)
+
+    def _graph_changed(self):
+        """Re-snapshot the room graph; the goal table and route engine are rebuilt on next use."""
+        self.room_graph = RoomGraph.from_nodes(self.shared_nodes)
+        self._goal_table = None
+        self._route_engine = None
+        self._graph_version = graph_version()
+
+    @property
+    def goal_table(self) -> GoalTable:
+        """Cheapest cost/next room towards the goal for every room (see graph_core)."""
+        if self._graph_version != graph_version():  # a Node.add_door outside connect_doors
+            self._graph_changed()
+        if self._goal_table is None:
+            self._goal_table = GoalTable(self.room_graph, self.a_star_game.goal.name)
+        return self._goal_table
+
+    @property
+    def route_engine(self) -> DStarLite:
+        """Start -> goal route kept up to date across danger changes (see dstar_lite)."""
+        if self._graph_version != graph_version():
+            self._graph_changed()
+        if self._route_engine is None:
+            self._route_engine = DStarLite(self.room_graph, self.a_star_game.start.name,
+                                           self.a_star_game.goal.name)
+        return self._route_engine
+
+    def set_room_danger(self, room_name: str, danger_cost):
+        """Change a room's danger at runtime (e.g. its boss was beaten). The
+        route engine repairs only what the change affects instead of searching
+        again; the goal table is rebuilt if something else asks for it."""
+        node = self.shared_nodes.get(room_name)
+        if node is None or node.danger_cost == danger_cost:
+            return
+        node.danger_cost = danger_cost
+        self.route_engine.set_danger(room_name, danger_cost)  # writes room_graph.danger too
+        self._goal_table = None
+        self._graph_version = bump_graph_version()  # cached answers are stale; the snapshot isn't
+
+    @property
+    def hpa(self) -> HierarchicalPlanner:
+        """Door-level walking planner over door_graph (see hpa)."""
+        if self._hpa is None:
+            self._hpa = HierarchicalPlanner(self.door_graph, self._door_distances)
+            self.room_index.save()  # keep any distances read from rooms for next time
+        return self._hpa
+
+    def _door_distances(self, room_name: str):
+        """Baked door-to-door walking distances of a room, from the room index
+        (filled by scripts/bake_maps.py) or else from the room itself."""
+        table = self.room_index.door_distances(room_name)
+        if table is None:
+            try:
+                room = self.room if room_name == self.rooms[self.cur] else self.map.load_room(room_name)
+            except (OSError, ValueError, KeyError):
+                return None
+            table = room.get_door_distances()
+            self.room_index.set_door_distances(room_name, table)
+        return table
+
+    def walk_route(self, goal_room: str | None = None) -> WalkRoute | None:
+        """Shortest walk from the player's tile into goal_room (default: the
+        goal room): the doors to take and the tiles up to the first one.
+        Memoized per tile until the door graph or a map changes."""
+        goal_room = goal_room or self.a_star_game.goal.name
+        room_name = self.rooms[self.cur]
+        cx, cy = self.player.rect.center
+        tile = (cx // TILE, cy // TILE)
+        return SEARCH_CACHE.lookup(
+            self.door_graph, "hpa", "tiles", (room_name, tile), goal_room,
+            lambda: self.hpa.route(room_name, room_walkable(self.room), self.room.door_cells, tile, goal_room))
+
+    def route_to_goal(self, room_name: str):
+        """(cost, [Node, ...]) of a cheapest route from room_name to the goal: the
+        incremental route for the start room, a table lookup otherwise; memoized
+        per graph version so panel redraws don't rebuild it. (inf, []) if the
+        goal can't be reached."""
+        def build():
+            if room_name == self.a_star_game.start.name:
+                cost, path = self.route_engine.search()
+            else:
+                cost, path = self.goal_table.route(room_name)
+            return cost, [self.shared_nodes[name] for name in self.room_graph.path_names(path)]
+        cost, path = SEARCH_CACHE.lookup(self.shared_nodes, "goal_table", "danger+edge",
+                                         room_name, self.a_star_game.goal.name, build)
+        return cost, list(path)
 
     def _verify_door_graph(self):
         for room, mapping in self.door_graph.items():
@@ -503,14 +626,13 @@ class Game:
                     seen.add(key)
 
     def _report_unconnected_doors(self):
-        """Load each room and report any door indices without a link after reverse fill.
+        """Report any door indices without a link after reverse fill (from the room index).
         Exception: room12 bottom door (allowed to be open end)."""
         for room_name in list(self.door_graph.keys()):
-            try:
-                rm = self.map.load_json_room(room_name)
-            except Exception:
+            rm = self.room_index.get(room_name)
+            if rm is None:
                 continue
-            door_count = len(rm.door_cells)
+            door_count = rm.door_count
             if door_count == 0:
                 continue
             mapped = set(self.door_graph.get(room_name, {}).keys())
@@ -532,7 +654,7 @@ class Game:
 
     def debug_list_room_doors(self, room_name: str):
         try:
-            tmp = self.map.load_json_room(room_name)
+            tmp = self.room_index.get(room_name)
             print(f"[Doors] {room_name} indices:")
             for i,(x,y) in enumerate(tmp.door_cells):
                 print(f"  {i}: tile=({x},{y}) pixel=({int((x+0.5)*TILE)},{int((y+0.5)*TILE)})")
@@ -596,8 +718,8 @@ class Game:
         if not current_node:
             return "Current room not in A* nodes."
 
-        # Run A* search
-        total_cost, path = self.a_star_game.search()
+        # the A* route from its start, looked up in the goal table (no per-frame search)
+        total_cost, path = self.route_to_goal(self.a_star_game.start.name)
         if total_cost == float('inf') or not path:
             return "There is no path to the goal from here."
 
@@ -734,7 +856,7 @@ class Game:
         # Prepare UCS path highlight
         current_node = self.ucs_game.current
         goal_node = self.ucs_game.goal
-        cost, path_nodes = self.ucs_game.uniform_cost_search(current_node, goal_node)
+        cost, path_nodes = self.route_to_goal(current_node.name)
         path_set = {n.name for n in path_nodes}
         # Build fast index for consecutive pairs
         consecutive_pairs = set()
@@ -878,7 +1000,7 @@ class Game:
         current_node = self.a_star_game.current
         goal_node = self.a_star_game.goal
 
-        cost, path_nodes = self.a_star_game.search()
+        cost, path_nodes = self.route_to_goal(self.a_star_game.start.name)
         path_set = {n.name for n in path_nodes}
         consecutive_pairs = {
             tuple(sorted((path_nodes[i].name, path_nodes[i + 1].name)))
@@ -983,8 +1105,9 @@ class Game:
             return
         is_back = (self.previous_room is not None and target_room_name == self.previous_room)
         self.cur = self.rooms.index(target_room_name)
-        # load room using existing player object so rect is preserved
-        self.room = self.map.load_json_room(self.rooms[self.cur], player=self.player)
+        # swap in the prefetched room (loads inline only on a prefetch miss);
+        # existing player object is kept so rect is preserved
+        self.room = self.map.use_room(self.prefetcher.take(self.rooms[self.cur]), player=self.player)
         cur_room_name = self.rooms[self.cur]
         cur_room = self.rooms[self.cur]
         if cur_room == "room12.json":
@@ -995,6 +1118,7 @@ class Game:
             self.boss = Boss((center_x, center_y))
         else:
             self.boss = None
+        self.room.chasers = 1 if self.boss else 0
         self._spawn_after_entry(target_door_index, is_back)
 
         # Ensure idle state after placement
@@ -1015,6 +1139,37 @@ class Game:
         # Rebuild layout if a previously unknown room got appended mid-game
         if cur_room_name not in self._room_graph_layout:
             self._build_room_graph_layout()
+        self._prefetch_neighbours()
+
+    def _hot_reload_maps(self):
+        """Apply map files edited since they were loaded: the live room is
+        patched in place, other copies are dropped and re-read on demand."""
+        changed = self.map.poll_changes()
+        if not changed:
+            return
+        self.map.assets.refresh()  # tileset images may have been added/renamed too
+        cur_name = self.rooms[self.cur]
+        for name in changed:
+            self.prefetcher.discard(name)
+            self.room_index.get(name)  # re-reads door cells (stamp changed)
+            if name != cur_name:
+                continue
+            try:
+                how = self.map.reload_room(self.room, name)
+            except (OSError, ValueError, KeyError) as e:  # e.g. caught mid-save
+                print(f"[HotReload] could not reload {name}: {e}")
+                continue
+            print(f"[HotReload] {name}: {how}")
+        self._hpa = None  # walking distances may have changed
+        bump_graph_version()
+        self.room_index.save()
+        self._report_unconnected_doors()
+        self._prefetch_neighbours()
+
+    def _prefetch_neighbours(self):
+        """Queue every room reachable through the current room's doors."""
+        links = self.door_graph.get(self.rooms[self.cur], {})
+        self.prefetcher.prefetch(dst for dst, _ in links.values() if dst in self.rooms)
 
 
     def _place_player_after_enter(self, is_back: bool, door_index: int):
@@ -1061,7 +1216,7 @@ class Game:
             # Collision safety: if inside a solid, fallback to door center
             test = self.player.rect.copy()
             test.center = (cx, cy_inside)
-            for s in self.room.solids:
+            for s in self.room.query_solids(test):
                 if test.colliderect(s):
                     cy_inside = int((dy + 0.5) * TILE)
                     break
@@ -1125,7 +1280,7 @@ class Game:
 
         # Final collision safety: if intersecting any solid, fall back to safe spawn
         test = self.player.rect.copy()
-        if any(test.colliderect(s) for s in self.room.solids):
+        if any(test.colliderect(s) for s in self.room.query_solids(test)):
             sx, sy = self.room.get_spawn_point(prefer_back=is_back)
             self.player.rect.center = (sx, sy)
 
@@ -1176,6 +1331,12 @@ class Game:
 
         dt = self.clock.tick(FPS) / 1000.0
 
+        # pick up maps saved in Tiled without restarting
+        self._map_poll_accum += dt
+        if MAP_POLL_SECONDS and self._map_poll_accum >= MAP_POLL_SECONDS:
+            self._map_poll_accum = 0.0
+            self._hot_reload_maps()
+
         for ev in pygame.event.get():
             if ev.type == pygame.QUIT:
                 return False
@@ -1229,6 +1390,7 @@ class Game:
                 # trigger death animation start once boss reaches 0
                 if self.boss.is_dead() and not self._boss_death_playing:
                     self._start_boss_death_animation()
+                    self.set_room_danger(self.rooms[self.cur], 1)  # room cleared
                     # keep boss object for its final frame reference removal handled by animation
                 
             if getattr(self, "just_entered_room", False):
@@ -1338,25 +1500,24 @@ class Game:
         if self._hazard_tick_accum < HAZARD_TICK_SECONDS:
             return
         self._hazard_tick_accum = 0.0
-        for r in self.room.hazard_rects():
-            if self.player.hitbox.colliderect(r):
-                self.player.take_damage(HAZARD_DAMAGE)
-                self.player.hurt_from(r.center)
-                if self.player.hp <= 0 and not self.player.dead:
-                    if hasattr(self.player, "kill_instant"):
-                        self.player.kill_instant()
-                    self._start_death_sequence()
-                break
+        # flag-grid lookup: only the tiles under the hitbox are checked
+        r = self.room.hazard_hit(self.player.hitbox)
+        if r is not None:
+            self.player.take_damage(HAZARD_DAMAGE)
+            self.player.hurt_from(r.center)
+            if self.player.hp <= 0 and not self.player.dead:
+                if hasattr(self.player, "kill_instant"):
+                    self.player.kill_instant()
+                self._start_death_sequence()
 
     def _check_bomb_trigger(self):
         if getattr(self, "_bomb_kill_timer", 0.0) > 0.0:
             return
-        if not hasattr(self.room, "bomb_rects"):
+        if not hasattr(self.room, "bomb_hit"):
             return
-        for r in self.room.bomb_rects():
-            if self.player.hitbox.colliderect(r):
-                self._explode_bomb(r.center)
-                break
+        r = self.room.bomb_hit(self.player.hitbox)
+        if r is not None:
+            self._explode_bomb(r.center)
 
     def _explode_bomb(self, center: tuple[int, int]):
         self._bomb_frames = []
@@ -1453,6 +1614,7 @@ class Game:
         self._boss_death_playing = True
         # remove boss entity from world (so no more collisions / hp bar) but keep animation
         self.boss = None
+        self.room.chasers = 0
 
     def _draw_win_screen(self):
         surf = pygame.Surface((SCREEN_W, SCREEN_H), pygame.SRCALPHA)
@@ -1564,6 +1726,8 @@ class Game:
             pygame.event.clear()
         except Exception:
             pass
+        if getattr(self, "prefetcher", None):
+            self.prefetcher.stop()  # __init__ starts a fresh one
         self.__init__(self.screen, room_json="room1.json")
 
 
@@ -0,0 +1,99 @@
+"""Hierarchical (HPA*-style) walking routes across rooms.
+
+The room graph (A_star.Node doors) says which room follows which, but not
+how far anybody has to walk. This planner works on two levels:
+
+* abstract: one node per (room, door index) in Game.door_graph. Doors of
+  the same room are joined by their tile-level walking distance (baked into
+  Room.door_distances / the room index), and every door_graph link joins a
+  door to the door it leads to, costing DOOR_STEP_COST;
+* concrete: only the first leg, from the walker's tile to the door it
+  should leave by, is refined on the current room's tile grid.
+
+Because every door is an abstract node and its intra-room edges are exact
+BFS distances, the abstract route is exactly the shortest walk (in tiles,
+4-connected) to the goal room; one BFS in the current room plus a Dijkstra
+over a few nodes per room answers a query.
+"""
+from __future__ import annotations
+import heapq
+import itertools
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from graph_core import walk_parents
+from tile_nav import Cell, bfs_distances, descend
+
+try:
+    from constants import DOOR_STEP_COST
+except Exception:
+    DOOR_STEP_COST = 1
+
+Door = Tuple[str, int]  # (room name, door index into its door_cells)
+
+
+@dataclass
+class WalkRoute:
+    cost: float                                          # tiles walked + door steps
+    doors: List[Door] = field(default_factory=list)      # exit, entry, exit, ..., entry into the goal room
+    first_leg: List[Cell] = field(default_factory=list)  # tiles from the start to the first exit door
+
+    @property
+    def rooms(self) -> List[str]:
+        """Rooms passed through, start room first."""
+        return [room for k, (room, _) in enumerate(self.doors) if k == 0 or self.doors[k - 1][0] != room]
+
+
+class HierarchicalPlanner:
+    """Door-level graph over door_graph, built once per door graph."""
+
+    def __init__(self, door_graph: Dict[str, Dict[int, Door]],
+                 door_distances: Callable[[str], np.ndarray | None]):
+        self.edges: Dict[Door, List[Tuple[Door, float]]] = {}
+        rooms = set(door_graph) | {dst for links in door_graph.values() for dst, _ in links.values()}
+        for room in sorted(rooms):
+            table = door_distances(room)
+            if table is None:
+                continue
+            n = len(table)
+            for i in range(n):
+                out = self.edges.setdefault((room, i), [])
+                out.extend(((room, j), float(table[i, j])) for j in range(n) if j != i and table[i, j] >= 0)
+        for room, links in door_graph.items():
+            for idx, (dst, dst_idx) in links.items():
+                self.edges.setdefault((room, idx), []).append(((dst, dst_idx), float(DOOR_STEP_COST)))
+
+    def route(self, room: str, walk: np.ndarray, door_cells, start: Cell, goal_room: str) -> WalkRoute | None:
+        """Shortest walk from tile `start` of `room` (walkable grid `walk`, its
+        door cells `door_cells`) into `goal_room`; None if there is none."""
+        if room == goal_room:
+            return WalkRoute(0.0)
+        dist = bfs_distances(walk, start)
+        counter = itertools.count()
+        best: Dict[Door, float] = {}
+        parent: Dict[Door, Door | None] = {}
+        frontier = []
+        for i, (x, y) in enumerate(door_cells):
+            d = int(dist[y, x])
+            if d >= 0 and (room, i) in self.edges:
+                best[(room, i)] = d
+                parent[(room, i)] = None
+                heapq.heappush(frontier, (d, next(counter), (room, i)))
+        done = set()
+        while frontier:
+            cost, _, door = heapq.heappop(frontier)
+            if door in done:
+                continue
+            done.add(door)
+            if door[0] == goal_room:
+                doors = walk_parents(parent, door)
+                return WalkRoute(cost, doors, descend(dist, door_cells[doors[0][1]]))
+            for nxt, step in self.edges.get(door, ()):
+                nd = cost + step
+                if nd < best.get(nxt, float("inf")):
+                    best[nxt] = nd
+                    parent[nxt] = door
+                    heapq.heappush(frontier, (nd, next(counter), nxt))
+        return None
@@ -3,6 +3,7 @@ from pathlib import Path
 from typing import Dict, List, Tuple
 import pygame
 from weapon import Weapon  # Import Weapon class
+import collision
 
 from constants import TILE, ANIM_FPS, PLAYER_SPEED, PLAYER_MAX_HP
 
@@ -166,6 +167,23 @@ class Player:
                     self.rect.bottom = min(self.rect.bottom, s.top) if dy > 0 else self.rect.bottom
                     self.rect.top    = max(self.rect.top,    s.bottom) if dy < 0 else self.rect.top
 
+    def _step(self, room, dx: float, dy: float, offset: Tuple[int,int]) -> None:
+        """_move_axis against only the solids near the swept rect (room spatial index)."""
+        if collision.uses_grid(room):
+            collision.move_axis(self.rect, dx, dy, room, offset)
+            return
+        if not hasattr(room, "query_solids"):
+            self._move_axis(dx, dy, room.solid_rects(offset))
+            return
+        start = self.rect.copy()
+        sweep = start.union(start.move(int(dx), int(dy)))
+        self._move_axis(dx, dy, room.query_solids(sweep, offset))
+        if not sweep.contains(self.rect):
+            # only when starting embedded in a solid: the push-out left the swept
+            # area, so redo against every solid to resolve exactly as before
+            self.rect.update(start)
+            self._move_axis(dx, dy, room.solid_rects(offset))
+
     # offset = camera/room offset; update works with world solids shifted to screen
     def update(self, dt: float, room, offset: Tuple[int,int]=(0,0)) -> None:
         self._read_input()
@@ -181,16 +199,15 @@ class Player:
                 self.attacking = False  # End the attack
                 self.weapon = None
 
-        solids = room.solid_rects(offset)
         # Apply player input movement (blocked while attacking or dead)
         if not self.dead and not self.attacking and self.vel.length_squared() > 0:
-            self._move_axis(self.vel.x * dt, 0, solids)
-            self._move_axis(0, self.vel.y * dt, solids)
+            self._step(room, self.vel.x * dt, 0, offset)
+            self._step(room, 0, self.vel.y * dt, offset)
 
         # Apply knockback while hurt
         if self.hurt_timer > 0 and self.knock.length_squared() > 0:
-            self._move_axis(self.knock.x * dt, 0, solids)
-            self._move_axis(0, self.knock.y * dt, solids)
+            self._step(room, self.knock.x * dt, 0, offset)
+            self._step(room, 0, self.knock.y * dt, offset)
             self.knock *= 0.88
             if self.knock.length_squared() < 4:
                 self.knock.update(0, 0)
@@ -0,0 +1,182 @@
+"""Lightweight per-room metadata read straight from the Tiled JSON.
+
+Door-graph validation only needs door cells and room sizes, not a rendered
+Room. This index reads the door layers the same way RoomMap.load_json_room
+classifies them, and persists the result in a small JSON file. It is keyed
+by each map's mtime/size, so later runs skip reparsing unchanged maps.
+
+Door-to-door walking distances need the classified room, so they aren't
+parsed here: the baker (or the first planner that loads the room) records
+them with set_door_distances() and they are kept until the map changes.
+"""
+from __future__ import annotations
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from room_map import DOOR_LAYER_KEYS, SPAWN_LAYER_KEYS, BACK_SPAWN_LAYER_KEYS, decode_layers
+
+INDEX_VERSION = 2
+
+
+@dataclass
+class RoomMeta:
+    name: str
+    size_tiles: Tuple[int, int]
+    tile_size: Tuple[int, int]
+    door_cells: List[Tuple[int, int]] = field(default_factory=list)
+    door_distances: List[List[int]] | None = None  # see Room.door_distances
+
+    @property
+    def pixel_size(self) -> Tuple[int, int]:
+        return self.size_tiles[0] * self.tile_size[0], self.size_tiles[1] * self.tile_size[1]
+
+    @property
+    def door_count(self) -> int:
+        return len(self.door_cells)
+
+
+def read_room_meta(json_path: Path) -> RoomMeta:
+    """Parse door cells + size from a map, matching load_json_room's door order
+    (infinite maps are stitched the same way, so cells share its origin)."""
+    data = json.loads(json_path.read_text(encoding="utf-8"))
+    grids, _, size_tiles = decode_layers(data)
+    door_cells: list[tuple[int, int]] = []
+    for layer in data.get("layers", []):
+        if layer.get("type") != "tilelayer":
+            continue
+        lname = layer.get("name", "").lower()
+        # same precedence as load_json_room: spawn layers, then floor, then door
+        if any(k in lname for k in SPAWN_LAYER_KEYS) or any(k in lname for k in BACK_SPAWN_LAYER_KEYS):
+            continue
+        if "floor" in lname or not any(k in lname for k in DOOR_LAYER_KEYS):
+            continue
+        ys, xs = np.nonzero(grids[id(layer)])
+        door_cells.extend(zip(xs.tolist(), ys.tolist()))
+    return RoomMeta(
+        name=json_path.name,
+        size_tiles=size_tiles,
+        tile_size=(data["tilewidth"], data["tileheight"]),
+        door_cells=door_cells,
+    )
+
+
+class RoomIndex:
+    """name -> RoomMeta for every map in maps_dir, persisted between runs."""
+
+    def __init__(self, maps_dir: str = "maps", cache_path: str | None = ".cache/room_index.json"):
+        self.maps_dir = Path(maps_dir).resolve()
+        self.cache_path = Path(cache_path).resolve() if cache_path else None
+        self._rooms: Dict[str, RoomMeta] = {}
+        self._stamps: Dict[str, Tuple[int, int]] = {}
+        self._unreadable: Dict[str, Tuple[int, int]] = {}  # map version that failed to parse (reported once)
+        self._dirty = False
+        self._load()
+
+    # ---------- queries ----------
+    def get(self, name: str) -> RoomMeta | None:
+        """Metadata for a room, or None if the map doesn't exist / can't be read
+        (a map that exists but fails to parse is reported once per version)."""
+        path = self.maps_dir / name
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        stamp = (st.st_mtime_ns, st.st_size)
+        if self._stamps.get(name) != stamp:
+            if self._unreadable.get(name) == stamp:
+                return None
+            try:
+                self._rooms[name] = read_room_meta(path)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"[RoomIndex] could not read {name}: {type(e).__name__}: {e}")
+                self._unreadable[name] = stamp
+                return None
+            self._stamps[name] = stamp
+            self._dirty = True
+        return self._rooms[name]
+
+    def door_count(self, name: str) -> int:
+        meta = self.get(name)
+        return meta.door_count if meta else 0
+
+    def door_cells(self, name: str) -> List[Tuple[int, int]]:
+        meta = self.get(name)
+        return list(meta.door_cells) if meta else []
+
+    def door_distances(self, name: str) -> np.ndarray | None:
+        meta = self.get(name)
+        if meta is None or meta.door_distances is None:
+            return None
+        table = np.array(meta.door_distances, dtype=np.int32)
+        return table if table.shape == (meta.door_count, meta.door_count) else None
+
+    def set_door_distances(self, name: str, table) -> None:
+        """Record a room's door distance table for the map version indexed now."""
+        meta = self.get(name)
+        if meta is not None and table is not None:
+            meta.door_distances = np.asarray(table).tolist()
+            self._dirty = True
+
+    def add(self, meta: RoomMeta, stamp: Tuple[int, int]) -> None:
+        """Record metadata read elsewhere (e.g. by a bake worker) for the map version `stamp`."""
+        self._rooms[meta.name] = meta
+        self._stamps[meta.name] = tuple(stamp)
+        self._dirty = True
+
+    def build(self, names) -> "RoomIndex":
+        """Index the given rooms up front and persist the result."""
+        for name in names:
+            self.get(name)
+        self.save()
+        return self
+
+    # ---------- persistence ----------
+    def _load(self) -> None:
+        if self.cache_path is None or not self.cache_path.exists():
+            return
+        try:
+            blob = json.loads(self.cache_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if blob.get("version") != INDEX_VERSION or blob.get("maps_dir") != self.maps_dir.as_posix():
+            return
+        for name, entry in blob.get("rooms", {}).items():
+            self._stamps[name] = tuple(entry["stamp"])
+            self._rooms[name] = RoomMeta(
+                name=name,
+                size_tiles=tuple(entry["size_tiles"]),
+                tile_size=tuple(entry["tile_size"]),
+                door_cells=[tuple(c) for c in entry["door_cells"]],
+                door_distances=entry["door_distances"],
+            )
+
+    def save(self) -> None:
+        if self.cache_path is None or not self._dirty:
+            return
+        blob = {
+            "version": INDEX_VERSION,
+            "maps_dir": self.maps_dir.as_posix(),
+            "rooms": {
+                name: {
+                    "stamp": list(self._stamps[name]),
+                    "size_tiles": list(meta.size_tiles),
+                    "tile_size": list(meta.tile_size),
+                    "door_cells": [list(c) for c in meta.door_cells],
+                    "door_distances": meta.door_distances,
+                }
+                for name, meta in self._rooms.items()
+            },
+        }
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(blob), encoding="utf-8")
+            os.replace(tmp, self.cache_path)
+            self._dirty = False
+        except OSError:
+            pass
@@ -1,14 +1,39 @@
 from __future__ import annotations
-import json, re
-from dataclasses import dataclass, field
+import base64, hashlib, json, math, os, pickle, threading, weakref, zlib
+from collections import OrderedDict
+from dataclasses import dataclass, field, fields
 from pathlib import Path
 from typing import List, Tuple
 
 from constants import TILE, HAZARD_GIDS, BOMB_GIDS
 from constants import LAMP_TILE_GIDS, TRAP_TILE_GIDS, ANIM_FPS
+import numpy as np
 import pygame
+from spatial import FlaggedRects, SpatialGrid, TileFlagGrid
+from collision import WalkGrid
+from asset_index import AssetIndex
+from tile_nav import GridPathfinder, clearance_mask, door_distance_table, room_walkable
+from flow_field import FlowField
 from pathlib import Path
 
+try:
+    from constants import ATLAS_BUDGET_MB
+except Exception:
+    ATLAS_BUDGET_MB = 64
+try:
+    from constants import FLOW_FIELD_MIN_CHASERS
+except Exception:
+    FLOW_FIELD_MIN_CHASERS = 8
+try:
+    from constants import SCREEN_W, SCREEN_H, STREAM_CHUNK_TILES, STREAM_MAX_CHUNKS
+except Exception:
+    SCREEN_W, SCREEN_H, STREAM_CHUNK_TILES, STREAM_MAX_CHUNKS = 1280, 720, 16, 48
+
+try:
+    from constants import BG as ROOM_BG    # what the game clears the screen to
+except Exception:
+    ROOM_BG = (18, 22, 28)
+
 # Try to import a global animation FPS, fallback to 8 if not defined
 try:
     from constants import ANIM_FPS as _GLOBAL_ANIM_FPS
@@ -18,6 +43,7 @@ except Exception:
 # New: keys that mark a door layer (doors are walkable, but detected)
 DOOR_LAYER_KEYS = ("door", "doors")
 DECOR_LAYER_KEYS = ("decor", "decoration")
+BASE_LAYER_KEYS = ("floor", "wall", "door", "solid")  # bottom layers that go into the opaque base
 HAZARD_LAYER_KEYS = ("lava", "trap", "hazard")
 SPAWN_LAYER_KEYS = ("player_spawn", "spawn")
 BACK_SPAWN_LAYER_KEYS = ("back_from_other_room", "return_spawn")  # lowercase for matching
@@ -41,6 +67,193 @@ OBJECT_BLOCKLIST = {
 # keep this so atlas door is walkable too (adjust id if yours differs).
 DECOR_ATLAS_WHITELIST = {34}               # walkable atlas-tile ids (e.g., door arch)
 
+# --- tile decoding ---
+GID_MASK = 0x0FFFFFFF                      # strips Tiled's flip/rotate flag bits
+ANIMATED_SHEETS = ("lamp.png", "trap.png")  # per-tile images drawn as animated overlays
+# gid flag bits (see RoomMap._gid_flag_table)
+GF_HAZARD = 1 << 0
+GF_BOMB   = 1 << 1
+GF_ANIM   = 1 << 2
+GF_TRAP   = 1 << 3
+GF_LAMP   = 1 << 4
+
+# --- streaming rooms ---
+# Maps whose pre-render would exceed this many pixels (or Tiled "infinite"
+# maps) are drawn from LRU-cached chunk surfaces instead of one big surface.
+STREAM_MIN_PIXELS = 4 * SCREEN_W * SCREEN_H
+
+# --- animated overlays ---
+# Overlays sharing a frame rate are pre-composited into n_phases = lcm(frame
+# counts) layer surfaces, unless that exceeds either bound.
+ANIM_MAX_PHASES = 24
+ANIM_LAYER_BUDGET = 32 * 1024 * 1024  # bytes per room
+ANIM_MIN_FILL = 0.5                   # min share of a layer actually covered by overlays
+
+# --- collision ---
+# Rooms with at most this many (merged) solid rects skip the spatial index.
+INDEX_MIN_SOLIDS = 32
+
+# --- baked room cache ---
+# Bump whenever the artifact layout (or what load_json_room produces) changes.
+BAKE_VERSION = 7
+BAKE_SUFFIX = ".bake"
+
+
+def bake_settings() -> str:
+    """Digest of the constants a bake's content depends on besides its files
+    (gid classification, animated sheets, tile size, background colour), so
+    editing them invalidates baked rooms like editing a map does."""
+    settings = {
+        "hazard": sorted(HAZARD_GIDS), "bomb": sorted(BOMB_GIDS),
+        "trap": sorted(TRAP_TILE_GIDS), "lamp": sorted(LAMP_TILE_GIDS),
+        "anim": sorted(ANIMATED_SHEETS), "tile": TILE, "bg": list(ROOM_BG),
+    }
+    return hashlib.sha1(json.dumps(settings, sort_keys=True).encode()).hexdigest()
+
+# --- hot reload ---
+# Room fields a tile-only edit refreshes from a logic rebuild (pixels are patched)
+RELOAD_LOGIC_FIELDS = ("floor_cells", "door_cells", "solids", "blocked", "tile_flags", "loose_solids",
+                       "spawn_override", "back_spawn_override", "hazards", "bombs", "animated_objects",
+                       "source_layers", "source_sig", "door_distances")
+RELOAD_KEEP_FIELDS = ("dynamic_solids", "solid_index", "walk_grid", "flag_grid", "chasers")  # see Room.adopt
+
+
+def merge_solid_cells(mask: np.ndarray) -> List[Tuple[int, int, int, int]]:
+    """Greedy-mesh a boolean tile mask into maximal (x, y, w, h) tile rectangles.
+
+    Scans row-major; each rect grows right to the end of its run, then down
+    while the rows below are solid across the same span. Every set cell ends
+    up in exactly one rect.
+    """
+    todo = np.array(mask, dtype=bool)
+    h = todo.shape[0]
+    out: List[Tuple[int, int, int, int]] = []
+    for y in range(h):
+        row = todo[y]
+        x = 0
+        while True:
+            nz = np.flatnonzero(row[x:])
+            if not nz.size:
+                break
+            x0 = x + int(nz[0])
+            gap = np.flatnonzero(~row[x0:])
+            x1 = x0 + (int(gap[0]) if gap.size else row.size - x0)
+            y1 = y + 1
+            while y1 < h and todo[y1, x0:x1].all():
+                y1 += 1
+            todo[y:y1, x0:x1] = False
+            out.append((x0, y, x1 - x0, y1 - y))
+            x = x1
+    return out
+
+
+def opaque_surface(size: Tuple[int, int]) -> pygame.Surface:
+    """Opaque surface in the display's pixel format (the fast blit path), cleared to ROOM_BG."""
+    screen = pygame.display.get_surface()
+    surf = pygame.Surface(size, 0, screen) if screen is not None else pygame.Surface(size)
+    surf.fill(ROOM_BG)
+    return surf
+
+
+def source_signature(data: dict) -> str:
+    """Digest of a Tiled map minus its tile data (chunk placement is kept).
+
+    Two versions of a map with the same signature differ only in which gids
+    sit in which cells, so a room can be patched tile by tile.
+    """
+    def strip(layer: dict) -> dict:
+        out = {k: v for k, v in layer.items()
+               if k not in ("data", "chunks", "layers", "encoding", "compression")}
+        if "chunks" in layer:
+            out["chunks"] = [(c["x"], c["y"], c["width"], c["height"]) for c in layer["chunks"]]
+        if "layers" in layer:
+            out["layers"] = [strip(l) for l in layer["layers"]]
+        return out
+    rest = {k: v for k, v in data.items() if k != "layers"}
+    rest["layers"] = [strip(l) for l in data.get("layers", [])]
+    return hashlib.sha1(json.dumps(rest, sort_keys=True).encode()).hexdigest()
+
+
+def decode_tile_data(layer: dict) -> np.ndarray:
+    """Flat uint32 gid array for a Tiled tile layer (or chunk).
+
+    Handles plain JSON arrays as well as ``encoding: base64`` with no, zlib or
+    gzip compression. Encoded layers go straight from bytes to a NumPy buffer,
+    never through a list of Python ints.
+    """
+    data = layer["data"]
+    if layer.get("encoding") != "base64":
+        return np.asarray(data, dtype=np.uint32)
+    raw = base64.b64decode(data)
+    compression = layer.get("compression") or ""
+    if compression in ("zlib", "gzip"):
+        # wbits | 32 auto-detects the zlib or gzip header; size hint avoids regrowing
+        expected = int(layer.get("width", 0)) * int(layer.get("height", 0)) * 4
+        raw = zlib.decompressobj(zlib.MAX_WBITS | 32).decompress(raw, expected or 0)
+    elif compression:
+        raise ValueError(f"unsupported tile layer compression: {compression!r}")
+    return np.frombuffer(raw, dtype="<u4")
+
+
+def decode_layers(data: dict) -> tuple[dict[int, np.ndarray], Tuple[int,int], Tuple[int,int]]:
+    """2-D gid arrays for every tile layer of a map, keyed by id(layer).
+
+    Finite maps map 1:1. Infinite maps have their chunks stitched into one
+    grid spanning all chunks; returns (grids, origin in tiles, size in tiles).
+    """
+    tile_layers = [l for l in data["layers"] if l.get("type") == "tilelayer"]
+    if not data.get("infinite"):
+        grids = {id(l): decode_tile_data(l).reshape(-1, l["width"]) & GID_MASK for l in tile_layers}
+        return grids, (0, 0), (data["width"], data["height"])
+
+    chunks = [(l, c) for l in tile_layers for c in l.get("chunks", [])]
+    if not chunks:
+        return {id(l): np.zeros((0, 0), dtype=np.uint32) for l in tile_layers}, (0, 0), (0, 0)
+    x0 = min(c["x"] for _, c in chunks); y0 = min(c["y"] for _, c in chunks)
+    x1 = max(c["x"] + c["width"] for _, c in chunks)
+    y1 = max(c["y"] + c["height"] for _, c in chunks)
+    grids = {id(l): np.zeros((y1 - y0, x1 - x0), dtype=np.uint32) for l in tile_layers}
+    for layer, c in chunks:
+        block = decode_tile_data({"data": c["data"], "width": c["width"], "height": c["height"],
+                                  "encoding": layer.get("encoding"),
+                                  "compression": layer.get("compression")})
+        gx, gy = c["x"] - x0, c["y"] - y0
+        grids[id(layer)][gy:gy + c["height"], gx:gx + c["width"]] = block.reshape(c["height"], c["width"]) & GID_MASK
+    return grids, (x0, y0), (x1 - x0, y1 - y0)
+
+
+@dataclass
+class TileAtlasSet:
+    """A map's tilesets as parallel arrays, so gid -> source rect is vectorized."""
+    atlases: list            # Surface|None per tileset
+    firstgids: np.ndarray    # ascending firstgid per tileset
+    tile_w: np.ndarray
+    tile_h: np.ndarray
+    cols: np.ndarray         # atlas columns; 0 when the atlas is missing
+
+    def blit(self, surf: pygame.Surface, gids: np.ndarray, xs: np.ndarray, ys: np.ndarray,
+             tw: int, th: int, origin: Tuple[int, int] = (0, 0)) -> None:
+        """Blit cells (xs, ys) -> gids onto surf in one blits() batch, in the given order.
+        `origin` is the pixel position of surf's top-left corner."""
+        ts_i = np.searchsorted(self.firstgids, gids, side="right") - 1
+        ok = ts_i >= 0
+        ok[ok] = self.cols[ts_i[ok]] > 0  # tileset has a loaded atlas
+        if not ok.any():
+            return
+        bi = ts_i[ok]
+        local = gids[ok].astype(np.int64) - self.firstgids[bi]
+        cols = self.cols[bi]
+        sw, sh = self.tile_w[bi], self.tile_h[bi]
+        sx = (local % cols) * sw
+        sy = (local // cols) * sh
+        atlases = self.atlases
+        ox, oy = origin
+        surf.blits([
+            (atlases[a], (x*tw - ox, y*th - oy), (u, v, w, h))
+            for a, x, y, u, v, w, h in zip(bi.tolist(), xs[ok].tolist(), ys[ok].tolist(),
+                                           sx.tolist(), sy.tolist(), sw.tolist(), sh.tolist())
+        ], doreturn=False)
+
 
 # ---------- simple data container ----------
 @dataclass
@@ -60,34 +273,185 @@ class Room:
     # Each entry: {"rect": pygame.Rect, "frames": [Surface,...], "fps": int}
     animated_objects: list = field(default_factory=list)
 
-    # draw pre-rendered room + animated overlays
+    # tile-grid collision (collision.py): blocked wall tiles, plus the solids
+    # the grid can't represent (object-layer rects) which are swept as rects
+    blocked: np.ndarray | None = field(default=None, repr=False)
+    loose_solids: List[pygame.Rect] = field(default_factory=list)
+    walk_grid: WalkGrid | None = field(default=None, repr=False)
+
+    # everything drawn above the opaque base (decor, ...), cropped to its bounds
+    overlay: pygame.Surface | None = field(default=None, repr=False)
+    overlay_pos: Tuple[int, int] = (0, 0)
+
+    # per-tile TileFlagGrid bits (HAZARD/BOMB/TRAP/LAMP/DOOR/SOLID); backs hazard_hit/bomb_hit
+    tile_flags: np.ndarray | None = field(default=None, repr=False)
+    flag_grid: TileFlagGrid | None = field(default=None, repr=False)
+
+    # broad phase over solids + dynamic_solids (see query_solids)
+    solid_index: SpatialGrid|None = field(default=None, repr=False)
+
+    # chasers in the room right now, kept up to date by whoever spawns them (see steering)
+    chasers: int = 0
+
+    # the map's tile-layer gid grids (file order) and a digest of everything
+    # else in it, so a hot reload can tell tile edits from structural ones
+    source_layers: list | None = field(default=None, repr=False)
+    source_sig: str | None = None
+
+    # (D, D) walking distances in tiles between door cells (tile_nav; -1 if
+    # unreachable), for the hierarchical door-to-door planner; baked, or
+    # filled in by get_door_distances()
+    door_distances: np.ndarray | None = field(default=None, repr=False)
+
+    def __post_init__(self):
+        if self.overlay is not None:
+            self.overlay.set_alpha(255, pygame.RLEACCEL)  # RLE skips its transparent runs
+        if self.solid_index is None:
+            self.solid_index = SpatialGrid(TILE, self.solids + self.dynamic_solids)
+        if self.walk_grid is None and self.blocked is not None:
+            self.walk_grid = WalkGrid(self.blocked, TILE)
+        if self.flag_grid is None and self.tile_flags is not None:
+            self.flag_grid = TileFlagGrid(self.tile_flags, TILE)
+        if self.flag_grid is not None:
+            self._hazard_lookup = FlaggedRects(self.hazards, self.flag_grid, TileFlagGrid.HAZARD)
+            self._bomb_lookup = FlaggedRects(self.bombs, self.flag_grid, TileFlagGrid.BOMB)
+
+    def adopt(self, other: "Room", names) -> None:
+        """Take the named fields from `other` (a fresh build of the same map) in
+        place. The grids/lookups derived from them come along; the broad phase
+        stays ours (it also holds dynamic solids) and only gets the difference."""
+        old_solids = self.solids
+        for name in names:
+            setattr(self, name, getattr(other, name))
+        self.walk_grid, self.flag_grid = other.walk_grid, other.flag_grid
+        if other.flag_grid is not None:
+            self._hazard_lookup, self._bomb_lookup = other._hazard_lookup, other._bomb_lookup
+        self.solid_index.update(old_solids, self.solids)
+        if self.overlay is not None:
+            self.overlay.set_alpha(255, pygame.RLEACCEL)
+        self._anim_key = None
+        self._pathfinder = None
+        self._flow_fields = None
+
+    # draw pre-rendered room (opaque base, then the alpha layer) + animated overlays
     def draw(self, screen: pygame.Surface, offset: Tuple[int, int]) -> None:
         screen.blit(self.surf, offset)
+        if self.overlay is not None:
+            screen.blit(self.overlay, (offset[0] + self.overlay_pos[0], offset[1] + self.overlay_pos[1]))
+        self._draw_overlays(screen, offset)
+
+    def resident_bytes(self) -> int:
+        """Pixel memory held by the room's pre-rendered surface(s)."""
+        size = sum(s.get_pitch() * s.get_height() for s in (self.surf, self.overlay) if s is not None)
+        return size + self._overlay_bytes()
 
+    def _overlay_bytes(self) -> int:
+        return sum(p.get_pitch() * p.get_height()
+                   for _, _, phases in getattr(self, "_anim_layers", ()) for p in phases)
+
+    def _draw_overlays(self, screen: pygame.Surface, offset: Tuple[int, int]) -> None:
         if not self.animated_objects:
             return
+        key = (id(self.animated_objects), len(self.animated_objects))
+        if getattr(self, "_anim_key", None) != key:
+            self._build_overlay_layers()
+            self._anim_key = key
 
         # Current animation tick
         ticks = pygame.time.get_ticks()
-        for obj in self.animated_objects:
-            frames: list[pygame.Surface] = obj.get("frames") or []
-            fps: int = int(obj.get("fps") or _GLOBAL_ANIM_FPS or 8)
+        ox, oy = offset
+        view = screen.get_rect()
+        screen.blits([(phases[(ticks // period_ms) % len(phases)], (x + ox, y + oy))
+                      for period_ms, (x, y, w, h), phases in self._anim_layers
+                      if view.colliderect((x + ox, y + oy, w, h))], doreturn=False)
+
+        # overlays that couldn't be pre-composited, in their original order
+        for obj in self._anim_loose:
+            frames = obj.get("frames") or []
             rect: pygame.Rect = obj["rect"]
-
             if not frames:
                 # Fallback: subtle alpha pulse if frames missing
                 # (keeps things visible even if sprite not found)
-                pulse = (pygame.math.sin(ticks * 0.005) + 1.0) * 0.25 + 0.5  # 0.5..1.0
-                tmp = pygame.Surface((rect.w, rect.h), pygame.SRCALPHA)
+                pulse = (math.sin(ticks * 0.005) + 1.0) * 0.25 + 0.5  # 0.5..1.0
+                tmp = self._pulse_surfs.get(rect.size)
+                if tmp is None:
+                    tmp = self._pulse_surfs[rect.size] = pygame.Surface(rect.size, pygame.SRCALPHA)
                 tmp.fill((255, 255, 255, int(255 * pulse)))
-                screen.blit(tmp, (rect.x - offset[0], rect.y - offset[1]))
+                screen.blit(tmp, (rect.x + ox, rect.y + oy))
                 continue
+            period_ms = max(1, int(1000 / max(1, int(obj.get("fps") or _GLOBAL_ANIM_FPS or 8))))
+            screen.blit(frames[(ticks // period_ms) % len(frames)], (rect.x + ox, rect.y + oy))
 
-            # Advance frame based on time
-            period_ms = max(1, int(1000 / max(1, fps)))
-            idx = (ticks // period_ms) % len(frames)
-            img = frames[idx]
-            screen.blit(img, (rect.x - offset[0], rect.y - offset[1]))
+    def _build_overlay_layers(self) -> None:
+        """Pre-composite overlay animations into per-phase layer surfaces.
+
+        Overlays that overlap (transitively) form a cluster, composited in list
+        order so stacking is unchanged; clusters in the same STREAM_CHUNK_TILES
+        chunk share a layer while it stays at least ANIM_MIN_FILL covered.
+        Everything in a layer has the same frame rate, so it repeats after
+        lcm(frame counts) ticks: drawing a frame is one blit per layer.
+        """
+        self._anim_layers: list = []      # (period_ms, (x, y, w, h), [phase surf, ...])
+        self._anim_loose: list = []
+        self._pulse_surfs = getattr(self, "_pulse_surfs", {})
+
+        def drawn(obj) -> pygame.Rect:
+            frames = obj.get("frames")
+            return pygame.Rect(obj["rect"].topleft, frames[0].get_size()) if frames else pygame.Rect(obj["rect"])
+
+        def period(obj) -> int:
+            return max(1, int(1000 / max(1, int(obj.get("fps") or _GLOBAL_ANIM_FPS or 8))))
+
+        clusters: list = []               # [bbox, [(list index, obj), ...]]
+        for i, obj in enumerate(self.animated_objects):
+            box, members = drawn(obj), [(i, obj)]
+            for c in [c for c in clusters if c[0].colliderect(box)]:
+                clusters.remove(c)
+                box = box.union(c[0])
+                members += c[1]
+            clusters.append([box, members])
+
+        loose, layers = [], {}            # (period, chunk) -> [[bbox, members, pixel area], ...]
+        chunk_px = STREAM_CHUNK_TILES * TILE
+        for box, members in clusters:
+            members.sort(key=lambda m: m[0])
+            objs = [o for _, o in members]
+            if not all(o.get("frames") for o in objs) or len({period(o) for o in objs}) > 1:
+                loose.extend(members)     # animated pulses / mixed rates: draw per object
+                continue
+            area = sum(drawn(o).w * drawn(o).h for o in objs)
+            packed = layers.setdefault((period(objs[0]), box.x // chunk_px, box.y // chunk_px), [])
+            for layer in packed:
+                merged = layer[0].union(box)
+                if merged.w * merged.h * ANIM_MIN_FILL <= layer[2] + area:
+                    layer[0], layer[2] = merged, layer[2] + area
+                    layer[1].extend(members)
+                    break
+            else:
+                packed.append([box, list(members), area])
+
+        budget = ANIM_LAYER_BUDGET
+        for (period_ms, _, _), packed in layers.items():
+            for box, members, _ in packed:
+                members.sort(key=lambda m: m[0])
+                n_phases = 1
+                for _, o in members:
+                    n_phases = math.lcm(n_phases, len(o["frames"]))
+                cost = box.w * box.h * 4 * n_phases
+                if n_phases > ANIM_MAX_PHASES or cost > budget:
+                    loose.extend(members)
+                    continue
+                budget -= cost
+                phases = []
+                for phase in range(n_phases):
+                    layer = pygame.Surface(box.size, pygame.SRCALPHA)
+                    layer.blits([(o["frames"][phase % len(o["frames"])],
+                                  (o["rect"].x - box.x, o["rect"].y - box.y)) for _, o in members], doreturn=False)
+                    layer.set_alpha(255, pygame.RLEACCEL)  # RLE skips the transparent gaps when blitting
+                    phases.append(layer)
+                self._anim_layers.append((period_ms, tuple(box), phases))
+        loose.sort(key=lambda m: m[0])
+        self._anim_loose = [o for _, o in loose]
 
     # door rectangles (world coords; shift by offset for screen coords)
     def door_rects(self, offset: Tuple[int,int]|None=None) -> List[pygame.Rect]:
@@ -106,10 +470,62 @@ class Room:
         if offset is None: return rects
         ox, oy = offset; return [r.move(-ox, -oy) for r in rects]
 
+    # first hazard/bomb overlapping `rect` (world coords), in hazards/bombs order;
+    # only the tiles under the rect are looked at
+    def hazard_hit(self, rect: pygame.Rect) -> pygame.Rect | None:
+        if not self.hazards:
+            return None
+        if self.flag_grid is None:
+            return next((r for r in self.hazards if rect.colliderect(r)), None)
+        return self._hazard_lookup.first_hit(rect)
+
+    def bomb_hit(self, rect: pygame.Rect) -> pygame.Rect | None:
+        if not self.bombs:
+            return None
+        if self.flag_grid is None:
+            return next((r for r in self.bombs if rect.colliderect(r)), None)
+        return self._bomb_lookup.first_hit(rect)
+
     # floor cell centres (world coords)
     def floor_positions(self) -> List[Tuple[int,int]]:
         return [ (int((x+0.5)*TILE), int((y+0.5)*TILE)) for x,y in self.floor_cells ]
 
+    def _steer_grid(self, size: int) -> np.ndarray:
+        return clearance_mask(room_walkable(self, touching=True), size)
+
+    def pathfinder(self, size: int = 1) -> GridPathfinder:
+        """Pathfinder for an entity `size` tiles wide over the tiles no solid
+        touches; its cells are the top-left tiles of free size x size blocks
+        (built on first use per size)."""
+        if getattr(self, "_pathfinder", None) is None:
+            self._pathfinder = {}
+        if size not in self._pathfinder:
+            self._pathfinder[size] = GridPathfinder(self._steer_grid(size))
+        return self._pathfinder[size]
+
+    def flow_field(self, size: int = 1) -> FlowField:
+        """Shared flow field for chasers `size` tiles wide, over the same
+        blocks as pathfinder(size); retarget it at the chased block."""
+        if getattr(self, "_flow_fields", None) is None:
+            self._flow_fields = {}
+        if size not in self._flow_fields:
+            self._flow_fields[size] = FlowField(self._steer_grid(size))
+        return self._flow_fields[size]
+
+    def steering(self, size: int = 1):
+        """What chasers `size` tiles wide steer by: per-chaser JPS paths from
+        pathfinder(size), or the shared flow_field(size) once the room holds
+        FLOW_FIELD_MIN_CHASERS of them. Both answer next_step(block, goal) and
+        expose the block grid as `walk`."""
+        if self.chasers >= FLOW_FIELD_MIN_CHASERS:
+            return self.flow_field(size)
+        return self.pathfinder(size)
+
+    def get_door_distances(self) -> np.ndarray:
+        if self.door_distances is None:
+            self.door_distances = door_distance_table(room_walkable(self), self.door_cells)
+        return self.door_distances
+
     def get_spawn_point(self, prefer_back: bool=False) -> Tuple[int, int]:
         # NEW: prefer explicit back spawn if requested
         if prefer_back and self.back_spawn_override:
@@ -125,30 +541,201 @@ class Room:
         w,h = self.pixel_size
         return w//2, h//2
 
+    def query_solids(self, rect: pygame.Rect, offset: Tuple[int,int]|None=None) -> List[pygame.Rect]:
+        """Solid rects near `rect` only (same coordinate convention as solid_rects)."""
+        if len(self.solid_index) <= INDEX_MIN_SOLIDS:
+            return self.solid_rects(offset)  # a flat scan is cheaper than hashing
+        if not offset or offset == (0, 0):
+            return self.solid_index.query(rect)
+        ox, oy = offset
+        return [r.move(-ox, -oy) for r in self.solid_index.query(rect.move(ox, oy))]
+
+    def set_dynamic_solids(self, rects: List[pygame.Rect]) -> None:
+        """Replace dynamic solids, updating the index incrementally."""
+        self.solid_index.update(self.dynamic_solids, rects)
+        self.dynamic_solids = rects
+
+    def loose_rects(self) -> List[pygame.Rect]:
+        """Solids not covered by walk_grid (object-layer + dynamic), world coords."""
+        return self.loose_solids + self.dynamic_solids if self.dynamic_solids else self.loose_solids
+
     # collision rects (optionally shifted to screen coords by -offset)
     def solid_rects(self, offset: Tuple[int,int]|None=None) -> List[pygame.Rect]:
         # merged static + dynamic
         rects = self.solids + (self.dynamic_solids if self.dynamic_solids else [])
-        if offset is None:
+        if not offset or offset == (0, 0):
             return rects
         ox, oy = offset
         return [r.move(-ox, -oy) for r in rects]
 
 
+@dataclass
+class StreamingRoom(Room):
+    """Room too large (or infinite) to pre-render: tiles are baked into
+    chunk surfaces around the camera on demand and evicted LRU."""
+    tile_size: Tuple[int, int] = (TILE, TILE)
+    layers: list = field(default_factory=list)      # 2-D gid arrays, draw order
+    tileset: TileAtlasSet | None = None
+    chunk_tiles: int = STREAM_CHUNK_TILES
+    max_chunks: int = STREAM_MAX_CHUNKS
+    _chunks: "OrderedDict[Tuple[int,int], pygame.Surface]" = field(default_factory=OrderedDict, repr=False)
+
+    def draw(self, screen: pygame.Surface, offset: Tuple[int, int]) -> None:
+        tw, th = self.tile_size
+        cw, ch = self.chunk_tiles * tw, self.chunk_tiles * th
+        ox, oy = offset
+        # visible world rect -> chunk index range
+        left = max(0, -ox); top = max(0, -oy)
+        right = min(self.pixel_size[0], screen.get_width() - ox)
+        bottom = min(self.pixel_size[1], screen.get_height() - oy)
+        if right > left and bottom > top:
+            for cy in range(top // ch, (bottom - 1) // ch + 1):
+                for cx in range(left // cw, (right - 1) // cw + 1):
+                    screen.blit(self._chunk(cx, cy), (ox + cx*cw, oy + cy*ch))
+        self._draw_overlays(screen, offset)
+
+    def _chunk(self, cx: int, cy: int) -> pygame.Surface:
+        key = (cx, cy)
+        surf = self._chunks.get(key)
+        if surf is not None:
+            self._chunks.move_to_end(key)
+            return surf
+        tw, th = self.tile_size
+        n = self.chunk_tiles
+        x0, y0 = cx * n, cy * n
+        h_tiles, w_tiles = self.layers[0].shape if self.layers else (0, 0)
+        x1, y1 = min(x0 + n, w_tiles), min(y0 + n, h_tiles)
+        surf = opaque_surface(((x1 - x0) * tw, (y1 - y0) * th))
+        for grid in self.layers:
+            block = grid[y0:y1, x0:x1]
+            ys, xs = np.nonzero(block)
+            if len(ys):
+                self.tileset.blit(surf, block[ys, xs], xs, ys, tw, th)
+        self._chunks[key] = surf
+        while len(self._chunks) > self.max_chunks:
+            self._chunks.popitem(last=False)
+        return surf
+
+    def resident_bytes(self) -> int:
+        return sum(s.get_pitch() * s.get_height() for s in self._chunks.values()) + self._overlay_bytes()
+
+
+class AtlasRegistry:
+    """Process-wide cache of decoded tileset atlases, keyed by resolved path.
+
+    Every room shares the same handful of sheets (wallfloor, B32x32, ...), so
+    each one is decoded + convert_alpha()'d once and reused. The registry
+    pins at most ``budget_bytes`` of atlases, least recently used first out.
+    An evicted atlas is only held weakly from then on: rooms still drawing
+    from it keep it alive (the budget can't free those), and a lookup while
+    it is alive returns that same surface instead of decoding a copy.
+    Thread-safe so background room loads can share it.
+    """
+    def __init__(self, budget_bytes: int|None=None):
+        self.budget_bytes = budget_bytes
+        self._surfs: "OrderedDict[str, pygame.Surface]" = OrderedDict()
+        self._evicted: "weakref.WeakValueDictionary[str, pygame.Surface]" = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.revived = 0  # hits on evicted atlases some room still held
+        self.bytes = 0    # pinned by the registry
+
+    @staticmethod
+    def _surface_bytes(surf: pygame.Surface) -> int:
+        return surf.get_pitch() * surf.get_height()
+
+    def get(self, path: Path) -> pygame.Surface:
+        key = path.as_posix()
+        with self._lock:
+            surf = self._surfs.get(key)
+            if surf is not None:
+                self._surfs.move_to_end(key)
+                self.hits += 1
+                return surf
+            surf = self._evicted.pop(key, None)
+            if surf is not None:
+                self.hits += 1
+                self.revived += 1
+                self._pin(key, surf)
+                return surf
+        # decode outside the lock; a racing duplicate decode is harmless
+        surf = pygame.image.load(key).convert_alpha()
+        with self._lock:
+            self.misses += 1
+            if key not in self._surfs:
+                self._pin(key, surf)
+            return self._surfs[key]
+
+    def _pin(self, key: str, surf: pygame.Surface) -> None:
+        self._surfs[key] = surf
+        self.bytes += self._surface_bytes(surf)
+        self._evict(keep=key)
+
+    def _evict(self, keep: str) -> None:
+        if self.budget_bytes is None:
+            return
+        while self.bytes > self.budget_bytes and len(self._surfs) > 1:
+            key, surf = next(iter(self._surfs.items()))
+            if key == keep:
+                break
+            del self._surfs[key]
+            self._evicted[key] = surf
+            self.bytes -= self._surface_bytes(surf)
+            self.evictions += 1
+
+    def set_budget(self, budget_bytes: int|None) -> None:
+        with self._lock:
+            self.budget_bytes = budget_bytes
+            newest = next(reversed(self._surfs), None)
+            if newest is not None:
+                self._evict(keep=newest)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._surfs.clear()
+            self._evicted.clear()
+            self.bytes = 0
+            self.hits = self.misses = self.evictions = self.revived = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "revived": self.revived, "bytes": self.bytes, "count": len(self._surfs), "budget_bytes": self.budget_bytes}
+
+
 class RoomMap:
     """Load pre-rendered room from a single Tiled JSON file."""
-    def __init__(self, maps_dir: str="maps", sprites_dir: str="sprites_en"):
+    # shared by every RoomMap (Game re-creates its RoomMap on restart)
+    atlases = AtlasRegistry(ATLAS_BUDGET_MB * 1024 * 1024)
+
+    def __init__(self, maps_dir: str="maps", sprites_dir: str="sprites_en",
+                 cache_dir: str|None=".cache/rooms", persist_assets: bool=True):
         self.maps_dir = Path(maps_dir).resolve()
         self.sprites_dir = Path(sprites_dir).resolve()
+        # baked rooms live here; None disables the cache entirely
+        self.cache_dir = Path(cache_dir).resolve() if cache_dir else None
         self._placed_atlas: list = []
         self._placed_objects: list = []
         self._rebuilt_solids: list[pygame.Rect] = []
         self._solids_dirty: bool = False  # new flag
         self.current_room: Room | None = None  # NEW
 
+        # map file -> (mtime_ns, size) when last loaded, for poll_changes()
+        self._stamps: dict[str, Tuple[int, int]|None] = {}
+
         # NEW: cache of sliced animation frames by filename
         self._anim_cache: dict[str, list[pygame.Surface]] = {}
 
+        # tileset image lookups (folder listings + parsed TSX files, persisted next to
+        # the bakes unless persist_assets is off, e.g. in bake worker processes)
+        self.assets = AssetIndex(
+            [self.sprites_dir, "assets", "maps", "."],
+            manifest=self.cache_dir.parent / "asset_index.json" if self.cache_dir else None,
+            read_only=not persist_assets,
+        )
+
     @staticmethod
     def _is(layer_name: str, needle: str) -> bool:
         return needle.lower() in layer_name.lower()
@@ -171,72 +758,306 @@ class RoomMap:
             frames.append(sheet.subsurface(r).copy())
         return frames
 
-    def _load_external_tsx_image(self, tsx_path: Path) -> Path|None:
-        if not tsx_path.exists(): return None
-        text = tsx_path.read_text(encoding="utf-8")
-        m = re.search(r'image source="([^"]+)"', text)
-        if not m: return None
-        return (tsx_path.parent / m.group(1)).resolve()
+    @staticmethod
+    def _gid_flag_table(max_gid: int, gid_to_image: dict[int, str]) -> np.ndarray:
+        """uint8 flags per gid (GF_*), so layers can be classified with one fancy index."""
+        size = max(max_gid, max(HAZARD_GIDS | BOMB_GIDS, default=0), max(gid_to_image, default=0)) + 1
+        table = np.zeros(size, dtype=np.uint8)
+        table[list(HAZARD_GIDS)] |= GF_HAZARD
+        table[list(BOMB_GIDS)] |= GF_BOMB
+        table[[g for g in TRAP_TILE_GIDS if g < size]] |= GF_TRAP
+        table[[g for g in LAMP_TILE_GIDS if g < size]] |= GF_LAMP
+        for gid, img in gid_to_image.items():
+            img = img.lower()
+            if img in ANIMATED_SHEETS:
+                table[gid] |= GF_ANIM
+            if img == "trap.png":
+                table[gid] |= GF_TRAP
+            elif img == "lamp.png":
+                table[gid] |= GF_LAMP
+        return table
+
+    def _anim_frames(self, img_name: str) -> list[pygame.Surface]:
+        """Sliced frames for an animated overlay sheet (lamp.png, trap.png); cached."""
+        frames = self._anim_cache.get(img_name)
+        if not frames:
+            sheet_path = Path("sprites") / img_name
+            if sheet_path.exists():
+                try:
+                    sheet = pygame.image.load(sheet_path.as_posix()).convert_alpha()
+                    frames = self._slice_square_strip(sheet)
+                except Exception:
+                    frames = []
+            else:
+                frames = []
+            self._anim_cache[img_name] = frames
+        return frames
+
+    def load_room(self, filename: str) -> Room:
+        """Load a room without making it current (safe from a worker thread)."""
+        json_path = (self.maps_dir / filename).resolve()
+        self._stamps[filename] = self._stamp(json_path)  # watched for hot reload
+        raw = json_path.read_bytes()
+        digest = hashlib.sha1(raw).hexdigest()
+
+        # Fast path: a baked artifact for this exact JSON whose atlases are unchanged
+        room = self._load_baked(json_path, digest)
+        if room is None:
+            room, bake = self._build_room(json_path, json.loads(raw))
+            if bake is not None:  # streaming rooms have no single pixel buffer to bake
+                self._write_baked(json_path, digest, room, bake)
+            self.assets.save()  # persist any newly parsed TSX files
+        return room
+
+    def bake(self, filename: str, force: bool=False) -> tuple[Room, Path|None]:
+        """Build one map and write its baked artifact (for offline baking).
+
+        Unless `force`, a fresh artifact is reused. Returns the room and the
+        artifact path, or None for streaming rooms / when caching is off.
+        """
+        json_path = (self.maps_dir / filename).resolve()
+        raw = json_path.read_bytes()
+        digest = hashlib.sha1(raw).hexdigest()
+        room = None if force else self._load_baked(json_path, digest)
+        if room is None:
+            room, bake = self._build_room(json_path, json.loads(raw))
+            if bake is None:
+                return room, None
+            self._write_baked(json_path, digest, room, bake)
+            self.assets.save()
+        path = self._bake_path(json_path)
+        return room, path if path is not None and path.exists() else None
 
     def load_json_room(self, filename: str, player=None) -> Room:  # added optional player
+        return self.use_room(self.load_room(filename), player)
+
+    def use_room(self, room: Room, player=None) -> Room:
+        """Make an already loaded (e.g. prefetched) room the current one."""
+        self.current_room = room  # NEW: track for dynamic solid updates
+        if player is not None:
+            self.apply_player_spawn(player)  # auto place & idle reset
+        return room
+
+    # ---------- hot reload ----------
+    @staticmethod
+    def _stamp(path: Path) -> Tuple[int, int]|None:
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def poll_changes(self) -> list[str]:
+        """Maps loaded through this RoomMap whose file changed since the last
+        load/poll (mtime + size polling; cheap enough to call every frame)."""
+        changed = []
+        for name, stamp in list(self._stamps.items()):
+            current = self._stamp(self.maps_dir / name)
+            if current != stamp:
+                self._stamps[name] = current
+                changed.append(name)
+        return changed
+
+    def reload_room(self, room: Room, filename: str) -> str:
+        """Bring a loaded `room` in line with its edited map, in place.
+
+        If only tile gids changed, the room's logic (collision, doors, hazards,
+        spawns) is rebuilt without rendering and just the changed cells are
+        redrawn into its surfaces; streaming rooms drop the affected chunks.
+        Structural edits (layers, tilesets, objects, size) rebuild the room.
+        Returns "patched" or "rebuilt". The bake isn't rewritten here (it's
+        stale by digest, so the next load_room of this map rebuilds it).
+        """
         json_path = (self.maps_dir / filename).resolve()
-        data = json.loads(json_path.read_text(encoding="utf-8"))
+        self._stamps[filename] = self._stamp(json_path)
+        data = json.loads(json_path.read_bytes())
+        streaming = isinstance(room, StreamingRoom)  # a live room keeps its kind
+        fresh, _ = self._build_room(json_path, data, stream=streaming, render=False)
+        if room.source_sig == fresh.source_sig and self._patch_pixels(room, fresh, json_path, data):
+            room.adopt(fresh, RELOAD_LOGIC_FIELDS + (("layers", "tileset") if streaming else ()))
+            result = "patched"
+        else:
+            fresh, _ = self._build_room(json_path, data, stream=streaming)
+            room.adopt(fresh, [f.name for f in fields(room) if f.name not in RELOAD_KEEP_FIELDS])
+            result = "rebuilt"
+        self.assets.save()
+        return result
+
+    def _patch_pixels(self, room: Room, fresh: Room, json_path: Path, data: dict) -> bool:
+        """Redraw the cells whose gids differ between `room` and `fresh` (same
+        map structure). False if that can't be done tile-locally."""
+        old, new = room.source_layers, fresh.source_layers
+        if old is None or len(old) != len(new) or any(a.shape != b.shape for a, b in zip(old, new)):
+            return False
+        diffs = [a != b for a, b in zip(old, new)]
+        if isinstance(room, StreamingRoom):
+            if diffs:
+                n = room.chunk_tiles
+                ys, xs = np.nonzero(np.logical_or.reduce(diffs))
+                for key in set(zip((xs // n).tolist(), (ys // n).tolist())):
+                    room._chunks.pop(key, None)  # re-baked from the new layers on next draw
+            return True
 
         tw, th = data["tilewidth"], data["tileheight"]
-        w_tiles, h_tiles = data["width"], data["height"]
-        room_px = (w_tiles*tw, h_tiles*th)
+        tiles, _, _ = self._load_tilesets(json_path, data)
+        if (tiles.tile_w != tw).any() or (tiles.tile_h != th).any():
+            return False  # tiles overhang their cell: neighbours would need redrawing too
+        bounds = room.surf.get_rect()
+        roles, _ = self._layer_roles(data, old, tiles, bounds)
+        new_roles, box = self._layer_roles(data, new, tiles, bounds)
+        if roles != new_roles:
+            return False  # a layer moved between the base and the overlay
+        overlay_box = pygame.Rect(room.overlay_pos, room.overlay.get_size()) if room.overlay else None
+        regrow = box != overlay_box
+        if regrow:  # the overlay's extent changed: draw it afresh (the base is still patched)
+            room.overlay, room.overlay_pos = ((pygame.Surface(box.size, pygame.SRCALPHA), box.topleft)
+                                              if box else (None, (0, 0)))
+
+        for role, surf, origin, clear in (("base", room.surf, (0, 0), ROOM_BG),
+                                          ("overlay", room.overlay, room.overlay_pos, (0, 0, 0, 0))):
+            idx = [i for i, r in enumerate(roles) if r == role]
+            if surf is None or not idx:
+                continue
+            if role == "overlay" and regrow:
+                for i in idx:
+                    ys, xs = np.nonzero(new[i])
+                    tiles.blit(surf, new[i][ys, xs], xs, ys, tw, th, origin=origin)
+                continue
+            ys, xs = np.nonzero(np.logical_or.reduce([diffs[i] for i in idx]))
+            if not len(ys):
+                continue
+            # a cell is the stack of its layers' tiles: clear it, then redraw the stack
+            ox, oy = origin
+            for x, y in zip(xs.tolist(), ys.tolist()):
+                surf.fill(clear, (x*tw - ox, y*th - oy, tw, th))
+            for i in idx:
+                gids = new[i][ys, xs]
+                drawn = gids != 0
+                tiles.blit(surf, gids[drawn], xs[drawn], ys[drawn], tw, th, origin=origin)
+        return True
+
+    # ---------- baked room cache ----------
+    def _bake_path(self, json_path: Path) -> Path|None:
+        if self.cache_dir is None:
+            return None
+        return self.cache_dir / f"{json_path.stem}{BAKE_SUFFIX}"
 
-        # Load all tileset atlases referenced by the map
+    @staticmethod
+    def _mtime_ns(path: Path) -> int|None:
+        try:
+            return path.stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def _load_baked(self, json_path: Path, digest: str) -> Room|None:
+        """Rebuild a Room from its baked artifact, or None if missing/stale."""
+        bake_path = self._bake_path(json_path)
+        if bake_path is None or not bake_path.exists():
+            return None
+        try:
+            with open(bake_path, "rb") as fh:
+                bake = pickle.load(fh)
+        except Exception:
+            return None  # corrupt or from an incompatible build: just rebake
+        if (bake.get("version") != BAKE_VERSION or bake.get("json_sha1") != digest
+                or bake.get("settings") != bake_settings()):
+            return None
+        for dep, mtime in bake.get("deps", []):
+            if self._mtime_ns(Path(dep)) != mtime:
+                return None
+
+        size = tuple(bake["pixel_size"])
+        surf = pygame.image.frombuffer(bake["pixels"], size, "RGB").convert()
+        overlay = None
+        if bake["overlay_pixels"] is not None:
+            overlay = pygame.image.frombuffer(bake["overlay_pixels"], bake["overlay_size"], "RGBA").convert_alpha()
+        animated_objects = [
+            {"rect": pygame.Rect(r), "frames": self._anim_frames(img_name), "fps": _GLOBAL_ANIM_FPS}
+            for r, img_name in bake["animated"]
+        ]
+        return Room(
+            surf=surf,
+            overlay=overlay,
+            overlay_pos=tuple(bake["overlay_pos"]),
+            pixel_size=size,
+            floor_cells=list(bake["floor_cells"]),
+            door_cells=list(bake["door_cells"]),
+            solids=[pygame.Rect(r) for r in bake["solids"]],
+            blocked=bake["blocked"],
+            tile_flags=bake["tile_flags"],
+            loose_solids=[pygame.Rect(r) for r in bake["loose_solids"]],
+            spawn_override=bake["spawn_override"],
+            back_spawn_override=bake["back_spawn_override"],
+            hazards=[pygame.Rect(r) for r in bake["hazards"]],
+            bombs=[pygame.Rect(r) for r in bake["bombs"]],
+            animated_objects=animated_objects,
+            source_layers=bake["source_layers"],
+            source_sig=bake["source_sig"],
+            door_distances=bake["door_distances"],
+        )
+
+    def _write_baked(self, json_path: Path, digest: str, room: Room, bake: dict) -> None:
+        bake_path = self._bake_path(json_path)
+        if bake_path is None:
+            return
+        bake["pixels"] = pygame.image.tobytes(room.surf, "RGB")
+        if room.overlay is not None:
+            bake["overlay_pixels"] = pygame.image.tobytes(room.overlay, "RGBA")
+            bake["overlay_size"] = room.overlay.get_size()
+        else:
+            bake["overlay_pixels"], bake["overlay_size"] = None, (0, 0)
+        bake["overlay_pos"] = room.overlay_pos
+        bake["version"] = BAKE_VERSION
+        bake["json_sha1"] = digest
+        bake["settings"] = bake_settings()
+        try:
+            bake_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = bake_path.with_suffix(bake_path.suffix + ".tmp")
+            with open(tmp, "wb") as fh:
+                pickle.dump(bake, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, bake_path)  # atomic: readers never see half an artifact
+        except OSError:
+            pass  # read-only checkout etc. -> simply run uncached
+
+    def _load_tilesets(self, json_path: Path, data: dict) -> tuple[TileAtlasSet, dict[int, str], list[Path]]:
+        """The map's tilesets as a TileAtlasSet, plus gid -> per-tile image name
+        (image collection tilesets) and the files a bake of it depends on."""
+        tw, th = data["tilewidth"], data["tileheight"]
         atlases: list[pygame.Surface|None] = []
         bases:    list[int] = []
         ts_defs   = data.get("tilesets", [])
         # Build helper map: global gid -> per-tile image filename (for image collection tilesets)
         gid_to_image: dict[int, str] = {}
+        # files whose mtimes invalidate the baked artifact; image candidates that
+        # were looked for but missing are recorded too (mtime None), so the file
+        # appearing later (also in a higher-priority folder) rebakes the room
+        deps: list[Path] = []
         for ts in ts_defs:
             bases.append(ts["firstgid"])
-            atlas_path: Path|None = None
 
             if "image" in ts:  # embedded image
-                atlas_path = (json_path.parent / ts["image"]).resolve()
+                declared = json_path.parent / ts["image"]
                 image_name = Path(ts["image"]).name
-            elif "source" in ts:  # external TSX → parse to find the image
-                tsx_path = (json_path.parent / ts["source"]).resolve()
-                img_from_tsx = self._load_external_tsx_image(tsx_path)
-                atlas_path = img_from_tsx if img_from_tsx else None
-                image_name = Path(img_from_tsx).name if img_from_tsx else None
+            elif "source" in ts:  # external TSX → (cached) parse to find the image
+                tsx_path = Path(os.path.normpath(json_path.parent / ts["source"]))
+                if self.assets.exists(tsx_path):
+                    deps.append(tsx_path)
+                declared = self.assets.tsx_image(tsx_path)
+                image_name = declared.name if declared else None
             else:
-                image_name = None
-
-            # If the resolved path doesn't exist (e.g., local Downloads path), try fallbacks by filename
-            if not (atlas_path and atlas_path.exists()):
-                candidate_dirs = [
-                    json_path.parent,
-                    Path("sprites_en").resolve(),
-                    Path("assets").resolve(),
-                    Path("maps").resolve(),
-                    Path(".").resolve(),
-                ]
-                if image_name:
-                    stem = Path(image_name).stem
-                    # try exact name first, then alternate extensions with same stem
-                    alt_exts = [".png", ".webp", ".jpg", ".jpeg"]
-                    for folder in candidate_dirs:
-                        # exact match
-                        cand = (folder / image_name)
-                        if cand.exists():
-                            atlas_path = cand.resolve()
-                            break
-                        # extension-agnostic match
-                        for ext in alt_exts:
-                            alt = (folder / f"{stem}{ext}")
-                            if alt.exists():
-                                atlas_path = alt.resolve()
-                                break
-                        if atlas_path and atlas_path.exists():
-                            break
-
-            if atlas_path and atlas_path.exists():
-                atlases.append(pygame.image.load(atlas_path.as_posix()).convert_alpha())
+                declared = image_name = None
+
+            # The declared path usually doesn't exist (e.g., local Downloads path): the
+            # index falls back to the same filename/stem in the map folder and asset roots
+            atlas_path = self.assets.find_image(declared, image_name, json_path.parent)
+            for candidate in self.assets.image_candidates(declared, image_name, json_path.parent):
+                if candidate == atlas_path:
+                    break
+                deps.append(candidate)
+
+            if atlas_path is not None:
+                deps.append(atlas_path)
+                atlases.append(self.atlases.get(atlas_path))
             else:
                 atlases.append(None)  # missing image is fine; we just don't blit
 
@@ -249,105 +1070,119 @@ class RoomMap:
                 global_gid = ts["firstgid"] + local_id
                 gid_to_image[global_gid] = Path(img).name
 
-        # quick helper to pick atlas by gid
-        def pick_atlas(gid: int):
-            idx = max(i for i, base in enumerate(bases) if gid >= base)
-            return idx, atlases[idx], bases[idx]
+        # Per-tileset blit parameters, indexed like `bases` (gid -> tileset via searchsorted)
+        ts_w = np.array([ts.get("tilewidth", tw) for ts in ts_defs], dtype=np.int64)
+        tiles = TileAtlasSet(
+            atlases=atlases,
+            firstgids=np.asarray(bases, dtype=np.int64),
+            tile_w=ts_w,
+            tile_h=np.array([ts.get("tileheight", th) for ts in ts_defs], dtype=np.int64),
+            cols=np.array([(a.get_width() // w) if a is not None else 0
+                           for a, w in zip(atlases, ts_w.tolist())], dtype=np.int64),
+        )
+        return tiles, gid_to_image, deps
+
+    @staticmethod
+    def _layer_roles(data: dict, grids: list[np.ndarray], tiles: TileAtlasSet,
+                     bounds: pygame.Rect) -> tuple[list[str|None], pygame.Rect|None]:
+        """Where each tile layer (in file order, `grids` alike) is drawn: "base" for
+        the leading run of floor/wall layers, "overlay" for the rest, None for
+        empty and spawn layers. Also returns the box the overlay layers can reach."""
+        tw, th = data["tilewidth"], data["tileheight"]
+        max_tw = int(tiles.tile_w.max()) if len(tiles.tile_w) else tw
+        max_th = int(tiles.tile_h.max()) if len(tiles.tile_h) else th
+        layers = [l for l in data["layers"] if l.get("type") == "tilelayer"]
+        roles: list[str|None] = []
+        in_base, box = True, None
+        for layer, grid in zip(layers, grids):
+            lname = layer.get("name", "").lower()
+            rows, cols_ = np.flatnonzero(grid.any(axis=1)), np.flatnonzero(grid.any(axis=0))
+            if (not rows.size or any(k in lname for k in SPAWN_LAYER_KEYS)
+                    or any(k in lname for k in BACK_SPAWN_LAYER_KEYS)):
+                roles.append(None)
+                continue
+            in_base = in_base and any(k in lname for k in BASE_LAYER_KEYS)
+            if in_base:
+                roles.append("base")
+                continue
+            roles.append("overlay")
+            x0, y0 = int(cols_[0]) * tw, int(rows[0]) * th
+            drawn = pygame.Rect(x0, y0, int(cols_[-1]) * tw + max_tw - x0, int(rows[-1]) * th + max_th - y0)
+            box = drawn if box is None else box.union(drawn)
+        box = box.clip(bounds) if box else None
+        return roles, box if box and box.w and box.h else None
+
+    def _build_room(self, json_path: Path, data: dict, stream: bool|None=None,
+                    render: bool=True) -> tuple[Room, dict|None]:
+        """Parse + render a Tiled map. Returns the Room and its bake payload
+        (None for streaming rooms). stream=None picks streaming for infinite
+        maps and maps larger than STREAM_MIN_PIXELS. render=False skips the
+        pre-render (no surfaces): just the room's logic, for hot reload."""
+        tw, th = data["tilewidth"], data["tileheight"]
+        layer_grids, (org_x, org_y), (w_tiles, h_tiles) = decode_layers(data)
+        room_px = (w_tiles*tw, h_tiles*th)
+        if stream is None:
+            stream = bool(data.get("infinite")) or room_px[0] * room_px[1] > STREAM_MIN_PIXELS
 
-        # Pre-render all tiles to a surface and collect logic cells
-        surf = pygame.Surface(room_px, pygame.SRCALPHA)
+        # Load all tileset atlases referenced by the map
+        tiles, gid_to_image, deps = self._load_tilesets(json_path, data)
+        source_layers = [layer_grids[id(l)] for l in data["layers"] if l.get("type") == "tilelayer"]
+
+        # gid -> flags lookup table (hazard / bomb / animated overlay)
+        max_gid = max((int(g.max()) for g in layer_grids.values() if g.size), default=0)
+        gid_flags = self._gid_flag_table(max_gid, gid_to_image)
+
+        # Pre-render all tiles to a surface (unless streaming) and collect logic cells
+        # opaque base (floor/walls over the screen colour, convert()ed for the fast
+        # blit path) + an alpha layer for whatever is drawn above it
+        surf = overlay = None
+        overlay_pos = (0, 0)
+        base_layers: set[int] = set()
+        if not stream and render:
+            surf = opaque_surface(room_px)
+            # the leading run of floor/wall layers is drawn into the base; size the
+            # alpha layer to what the remaining layers can reach
+            roles, box = self._layer_roles(data, source_layers, tiles, surf.get_rect())
+            tile_layers = [l for l in data["layers"] if l.get("type") == "tilelayer"]
+            base_layers = {id(l) for l, role in zip(tile_layers, roles) if role == "base"}
+            if box:
+                overlay, overlay_pos = pygame.Surface(box.size, pygame.SRCALPHA), box.topleft
+        render_layers: list[np.ndarray] = []  # streaming: grids the chunks are baked from
         floor_cells: list[tuple[int,int]] = []
         door_cells : list[tuple[int,int]] = []
-        solid_cells: list[tuple[int,int]] = []
         spawn_cells: list[tuple[int,int]] = []  # NEW
         back_spawn_cells: list[tuple[int,int]] = []  # NEW
         object_solids: list[pygame.Rect] = []  # moved: now for all rooms
         hazards: list[pygame.Rect] = []       # NEW
         bombs: list[pygame.Rect] = []
         animated_objects: list = []           # NEW: torch/trap renderers
+        animated_bake: list = []              # (rect, sheet name) pairs for the cache
+        solid_mask = np.zeros((h_tiles, w_tiles), dtype=bool)
+        door_mask = np.zeros((h_tiles, w_tiles), dtype=bool)
+        tile_flags = np.zeros((h_tiles, w_tiles), dtype=np.uint8)
+
+        def cells(ys: np.ndarray, xs: np.ndarray) -> list[tuple[int,int]]:
+            return list(zip(xs.tolist(), ys.tolist()))
+
+        def tile_rects(ys: np.ndarray, xs: np.ndarray) -> list[pygame.Rect]:
+            return [pygame.Rect(x*tw, y*th, tw, th) for x, y in zip(xs.tolist(), ys.tolist())]
+
+        def mark(mask: np.ndarray, ys: np.ndarray, xs: np.ndarray, value=True) -> None:
+            inside = (ys < h_tiles) & (xs < w_tiles)
+            if mask.dtype == bool:
+                mask[ys[inside], xs[inside]] = value
+            else:
+                mask[ys[inside], xs[inside]] |= value
 
         for layer in data["layers"]:
             ltype = layer.get("type")
-            if ltype == "tilelayer":
-                name = layer.get("name", "")
-                lname = name.lower()
-                grid = layer["data"]
-                width = layer["width"]
-
-                is_spawn_layer = any(k in lname for k in SPAWN_LAYER_KEYS)
-                is_back_spawn_layer = any(k in lname for k in BACK_SPAWN_LAYER_KEYS)
-
-                for i, gid in enumerate(grid):
-                    if gid == 0: continue
-                    x, y = self._gid_to_xy(i, width)
-
-                    if is_spawn_layer:
-                        spawn_cells.append((x, y)); continue
-                    if is_back_spawn_layer:
-                        back_spawn_cells.append((x, y)); continue
-
-                    # blit (unchanged)
-                    atlas_i, atlas, base = pick_atlas(gid)
-                    if atlas is not None:
-                        ts_def = ts_defs[atlas_i]
-                        ltw = ts_def.get("tilewidth", tw)
-                        lth = ts_def.get("tileheight", th)
-                        cols = atlas.get_width() // ltw
-                        local = gid - base
-                        sx = (local % cols) * ltw
-                        sy = (local // cols) * lth
-                        surf.blit(atlas, pygame.Rect(x*tw, y*th, ltw, lth),
-                                  pygame.Rect(sx, sy, ltw, lth))
-
-                    # logic classification
-                    tile_rect = pygame.Rect(x*tw, y*th, tw, th)
-                    if self._is(name, "floor"):
-                        floor_cells.append((x, y))
-                    elif any(k in lname for k in DOOR_LAYER_KEYS):
-                        door_cells.append((x, y))
-                    elif gid in HAZARD_GIDS:
-                        hazards.append(tile_rect)
-                    elif gid in BOMB_GIDS:
-                        hazards.append(tile_rect)
-                        bombs.append(tile_rect.inflate(1, 1))
-                    elif any(k in lname for k in HAZARD_LAYER_KEYS):   # layer named "trap/lava/hazard"
-                        hazards.append(tile_rect)
-                    elif any(k in lname for k in DECOR_LAYER_KEYS):
-                        pass
-                    elif "wall" in lname or "solid" in lname:
-                        solid_cells.append((x, y))
-                    else:
-                        pass
-
-                    # --- NEW: animated torch/trap overlays by image filename ---
-                    img_name = (gid_to_image.get(gid) or "").lower()
-                    if img_name in ("lamp.png", "trap.png"):
-                        # Load and slice once; reuse from cache
-                        frames = self._anim_cache.get(img_name) 
-                        if not frames:
-                            sheet_path = Path("sprites") / img_name
-                            if sheet_path.exists():
-                                try:
-                                    sheet = pygame.image.load(sheet_path.as_posix()).convert_alpha()
-                                    frames = self._slice_square_strip(sheet)
-                                except Exception:
-                                    frames = []
-                            else:
-                                frames = []
-                            self._anim_cache[img_name] = frames
-
-                        animated_objects.append({
-                            "rect": tile_rect,
-                            "frames": frames,
-                            "fps": _GLOBAL_ANIM_FPS,
-                        })
-
-            elif ltype == "objectgroup":
+            if ltype == "objectgroup":
                 lname = layer.get("name", "").lower()
                 if "object layer" in lname:
                     for obj in layer.get("objects", []):
-                        x = obj.get("x", 0)
-                        y = obj.get("y", 0)
+                        # infinite maps: shift so the stitched grid starts at (0, 0)
+                        x = obj.get("x", 0) - org_x * tw
+                        y = obj.get("y", 0) - org_y * th
                         w = obj.get("width", 0)
                         h = obj.get("height", 0)
                         # Tiled object y is top-left; create rect directly
@@ -362,12 +1197,77 @@ class RoomMap:
                             if img == "icon41.png":
                                 hazards.append(r.copy())
                                 bombs.append(r.inflate(-6, -6))
+                continue
+            if ltype != "tilelayer":
+                continue
 
-        door_set = set(door_cells)
+            grid = layer_grids[id(layer)]
+            lname = layer.get("name", "").lower()
+            # row-major, i.e. the same cell order as walking layer["data"]
+            ys, xs = np.nonzero(grid)
+            if not len(ys):
+                continue
 
-        # keep every solid except those that are doors
-        solid_cells = [(x, y) for (x, y) in solid_cells if (x, y) not in door_set]
-        solids = [pygame.Rect(x*TILE, y*TILE, TILE, TILE) for x, y in solid_cells]
+            if any(k in lname for k in SPAWN_LAYER_KEYS):
+                spawn_cells.extend(cells(ys, xs)); continue
+            if any(k in lname for k in BACK_SPAWN_LAYER_KEYS):
+                back_spawn_cells.extend(cells(ys, xs)); continue
+
+            gids = grid[ys, xs]
+            flags = gid_flags[gids]
+            for gf, tf in ((GF_TRAP, TileFlagGrid.TRAP), (GF_LAMP, TileFlagGrid.LAMP)):
+                hit = (flags & gf) != 0
+                mark(tile_flags, ys[hit], xs[hit], tf)
+
+            # blit: every cell's tileset resolved at once, then one batched blits() call
+            if stream:
+                render_layers.append(grid)
+            elif render:
+                if id(layer) in base_layers:
+                    tiles.blit(surf, gids, xs, ys, tw, th)
+                elif overlay is not None:
+                    tiles.blit(overlay, gids, xs, ys, tw, th, origin=overlay_pos)
+
+            # logic classification (same precedence as the old per-cell elif chain)
+            if "floor" in lname:
+                floor_cells.extend(cells(ys, xs))
+            elif any(k in lname for k in DOOR_LAYER_KEYS):
+                door_cells.extend(cells(ys, xs))
+                mark(door_mask, ys, xs)
+            else:
+                hazard_gid = (flags & (GF_HAZARD | GF_BOMB)) != 0
+                if any(k in lname for k in HAZARD_LAYER_KEYS):   # layer named "trap/lava/hazard"
+                    is_hazard = np.ones_like(hazard_gid)
+                else:
+                    is_hazard = hazard_gid
+                    if not any(k in lname for k in DECOR_LAYER_KEYS) and ("wall" in lname or "solid" in lname):
+                        solid = ~hazard_gid
+                        mark(solid_mask, ys[solid], xs[solid])
+                hazards.extend(tile_rects(ys[is_hazard], xs[is_hazard]))
+                mark(tile_flags, ys[is_hazard], xs[is_hazard], TileFlagGrid.HAZARD)
+                is_bomb = (flags & (GF_HAZARD | GF_BOMB)) == GF_BOMB
+                bombs.extend(r.inflate(1, 1) for r in tile_rects(ys[is_bomb], xs[is_bomb]))
+                mark(tile_flags, ys[is_bomb], xs[is_bomb], TileFlagGrid.BOMB)
+
+            # --- animated torch/trap overlays by image filename ---
+            anim = (flags & GF_ANIM) != 0
+            for x, y, gid in zip(xs[anim].tolist(), ys[anim].tolist(), gids[anim].tolist()):
+                img_name = gid_to_image[gid].lower()
+                tile_rect = pygame.Rect(x*tw, y*th, tw, th)
+                # Load and slice once; reuse from cache
+                animated_objects.append({
+                    "rect": tile_rect,
+                    "frames": self._anim_frames(img_name),
+                    "fps": _GLOBAL_ANIM_FPS,
+                })
+                animated_bake.append((tuple(tile_rect), img_name))
+
+        # keep every solid except those that are doors, merged into as few rects as possible
+        blocked = solid_mask & ~door_mask
+        tile_flags[door_mask] |= TileFlagGrid.DOOR
+        tile_flags[blocked] |= TileFlagGrid.SOLID
+        solids = [pygame.Rect(x*TILE, y*TILE, w*TILE, h*TILE)
+                  for x, y, w, h in merge_solid_cells(blocked)]
         solids.extend(object_solids)  # include object layer solids globally
 
         # NEW: compute spawn_override if any spawn cells collected
@@ -383,22 +1283,50 @@ class RoomMap:
             py = [ (y + 0.5) * TILE for _,y in back_spawn_cells ]
             back_spawn_override = (int(sum(px)/len(px)), int(sum(py)/len(py)))
 
-        room = Room(
+        room_kw = dict(
             surf=surf,
+            overlay=overlay,
+            overlay_pos=overlay_pos,
             pixel_size=room_px,
             floor_cells=floor_cells,
             door_cells=door_cells,
             solids=solids,
+            blocked=blocked,
+            tile_flags=tile_flags,
+            loose_solids=list(object_solids),
             spawn_override=spawn_override,
             back_spawn_override=back_spawn_override,  # NEW
             hazards=hazards,
             bombs=bombs,
             animated_objects=animated_objects,        # NEW
+            source_layers=source_layers,
+            source_sig=source_signature(data),
         )
-        self.current_room = room  # NEW: track for dynamic solid updates
-        if player is not None:
-            self.apply_player_spawn(player)  # auto place & idle reset
-        return room
+        if not render:
+            room_kw["solid_index"] = SpatialGrid(TILE)  # Room.adopt updates the live room's index
+        if stream:
+            return StreamingRoom(**room_kw, tile_size=(tw, th), layers=render_layers, tileset=tiles), None
+        room = Room(**room_kw)
+        room.get_door_distances()  # baked with the room; streaming/logic-only builds compute it on demand
+        bake = {
+            "deps": [(p.as_posix(), self._mtime_ns(p)) for p in deps],
+            "pixel_size": room_px,
+            "floor_cells": floor_cells,
+            "door_cells": door_cells,
+            "solids": [tuple(r) for r in solids],
+            "blocked": blocked,
+            "tile_flags": tile_flags,
+            "loose_solids": [tuple(r) for r in object_solids],
+            "spawn_override": spawn_override,
+            "back_spawn_override": back_spawn_override,
+            "hazards": [tuple(r) for r in hazards],
+            "bombs": [tuple(r) for r in bombs],
+            "animated": animated_bake,
+            "source_layers": source_layers,
+            "source_sig": room.source_sig,
+            "door_distances": room.door_distances,
+        }
+        return room, bake
 
     def _rebuild_solids(self):
         """Recreate solid rect list from placed atlas tiles and loose object PNGs."""
@@ -429,7 +1357,7 @@ class RoomMap:
         self._rebuilt_solids = solids
         self._solids_dirty = False
         if self.current_room:
-            self.current_room.dynamic_solids = solids  # push to room so room.solid_rects() includes them
+            self.current_room.set_dynamic_solids(solids)  # push to room so room.solid_rects() includes them
 
     # --- NEW PUBLIC HELPERS -------------------------------------------------
     def add_object_placement(self, obj):
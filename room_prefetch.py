@@ -0,0 +1,125 @@
+"""Background loading of the rooms reachable from the current one.
+
+While the player walks around a room, the rooms behind its doors are loaded
+(through RoomMap's bake cache) on a worker thread and parked in a small LRU.
+Entering one of them is then a dictionary lookup instead of a blocking load.
+"""
+from __future__ import annotations
+import queue
+import threading
+from collections import OrderedDict
+from typing import Iterable
+
+import pygame
+
+from room_map import Room, RoomMap
+
+try:
+    from constants import PREFETCH_MAX_ROOMS, PREFETCH_BUDGET_MB
+except Exception:
+    PREFETCH_MAX_ROOMS, PREFETCH_BUDGET_MB = 6, 96
+
+
+def room_bytes(room: Room) -> int:
+    """Approximate pixel memory held by a room's pre-rendered surface(s)."""
+    return room.resident_bytes()
+
+
+class RoomPrefetcher:
+    """LRU of ready Room objects, filled by a daemon worker thread."""
+
+    def __init__(self, room_map: RoomMap, max_rooms: int = PREFETCH_MAX_ROOMS,
+                 max_bytes: int = PREFETCH_BUDGET_MB * 1024 * 1024):
+        self.map = room_map
+        self.max_rooms = max(1, max_rooms)
+        self.max_bytes = max_bytes
+        self._ready: "OrderedDict[str, Room]" = OrderedDict()
+        self._sizes: dict[str, int] = {}  # bytes charged per ready room (as stored)
+        self._bytes = 0
+        self._inflight: dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+        self._jobs: "queue.Queue[str|None]" = queue.Queue()
+        self.hits = 0
+        self.misses = 0
+        self._thread = threading.Thread(target=self._run, name="room-prefetch", daemon=True)
+        self._thread.start()
+
+    # ---------- public API ----------
+    def prefetch(self, names: Iterable[str]) -> None:
+        """Queue rooms for background loading (already ready/queued ones are skipped)."""
+        for name in names:
+            with self._lock:
+                if name in self._ready:
+                    self._ready.move_to_end(name)  # still wanted: keep it warm
+                    continue
+                if name in self._inflight:
+                    continue
+                self._inflight[name] = threading.Event()
+            self._jobs.put(name)
+
+    def take(self, name: str) -> Room:
+        """Return a ready room, waiting for an in-flight load or loading inline."""
+        with self._lock:
+            room = self._ready.get(name)
+            pending = self._inflight.get(name)
+            if room is not None:
+                self._ready.move_to_end(name)
+                self.hits += 1
+                return room
+        if pending is not None:
+            pending.wait()
+            with self._lock:
+                room = self._ready.get(name)
+                if room is not None:
+                    self.hits += 1
+                    return room
+        # not prefetched (or the background load failed): load on this thread
+        with self._lock:
+            self.misses += 1
+        room = self.map.load_room(name)
+        self._store(name, room)
+        return room
+
+    def discard(self, name: str|None=None) -> None:
+        """Forget one ready room (or all of them), e.g. after the map changed on disk."""
+        with self._lock:
+            names = [name] if name is not None else list(self._ready)
+            for n in names:
+                if self._ready.pop(n, None) is not None:
+                    self._bytes -= self._sizes.pop(n)
+
+    def stop(self) -> None:
+        self._jobs.put(None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "ready": list(self._ready),
+                    "bytes": self._bytes, "inflight": list(self._inflight)}
+
+    # ---------- internals ----------
+    def _store(self, name: str, room: Room) -> None:
+        with self._lock:
+            if self._ready.pop(name, None) is not None:
+                self._bytes -= self._sizes.pop(name)
+            self._ready[name] = room
+            self._sizes[name] = room_bytes(room)
+            self._bytes += self._sizes[name]
+            # evict least recently used rooms over either bound (keep the newest)
+            while len(self._ready) > 1 and (len(self._ready) > self.max_rooms or self._bytes > self.max_bytes):
+                evicted, _ = self._ready.popitem(last=False)
+                self._bytes -= self._sizes.pop(evicted)
+
+    def _run(self) -> None:
+        while True:
+            name = self._jobs.get()
+            if name is None:
+                return
+            try:
+                self._store(name, self.map.load_room(name))
+            except (OSError, ValueError, KeyError, pygame.error) as e:
+                print(f"[Prefetch] could not load {name}: {e}")
+            finally:
+                with self._lock:
+                    done = self._inflight.pop(name, None)
+                if done is not None:
+                    done.set()
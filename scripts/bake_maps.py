@@ -0,0 +1,128 @@
+"""Bake every room in maps/ into RoomMap's artifact cache, in parallel.
+
+Each worker process parses, classifies and renders its maps (collision rects
+merged, door metadata extracted) and writes the same .bake artifacts
+RoomMap.load_room would, so the game starts from them instead of building
+rooms. The room metadata index the game validates doors with is refreshed
+too (including the door-to-door walking distances the route planner
+reads), as is the asset index: workers only read it, and this process
+writes it once from what they looked up. A manifest with per-room timings
+and artifact sizes is written next to the artifacts. Run from anywhere:
+
+    python scripts/bake_maps.py [--jobs N] [--force]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)
+
+MANIFEST_NAME = "manifest.json"
+
+_room_map = None  # per worker process
+
+
+def _init_worker(maps_dir: str, sprites_dir: str, cache_dir: str) -> None:
+    global _room_map
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import pygame
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))  # surfaces are converted while building
+    from room_map import RoomMap
+    # workers only read the asset manifest; the parent merges their lookups and writes it once
+    _room_map = RoomMap(maps_dir, sprites_dir, cache_dir=cache_dir, persist_assets=False)
+
+
+def _bake_one(name: str, force: bool) -> dict:
+    from room_index import read_room_meta
+    json_path = _room_map.maps_dir / name
+    st = json_path.stat()
+    t0 = time.perf_counter()
+    room, artifact = _room_map.bake(name, force=force)
+    seconds = time.perf_counter() - t0
+    meta = read_room_meta(json_path)
+    meta.door_distances = room.get_door_distances().tolist()
+    return {
+        "name": name,
+        "seconds": round(seconds, 4),
+        "bytes": artifact.stat().st_size if artifact else 0,
+        "artifact": artifact.name if artifact else None,
+        "streamed": artifact is None,
+        "pixel_size": list(room.pixel_size),
+        "solids": len(room.solids),
+        "doors": meta.door_count,
+        "meta": meta,
+        "stamp": (st.st_mtime_ns, st.st_size),
+        "assets": _room_map.assets.export(),
+    }
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--maps", default="maps")
+    ap.add_argument("--sprites", default="sprites_en")
+    ap.add_argument("--cache-dir", default=".cache/rooms")
+    ap.add_argument("--index", default=".cache/room_index.json", help="room metadata index to refresh")
+    ap.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--force", action="store_true", help="rebake even if an artifact is fresh")
+    args = ap.parse_args()
+
+    from room_index import RoomIndex
+    from room_map import RoomMap
+
+    names = sorted(p.name for p in Path(args.maps).glob("*.json"))
+    if not names:
+        print(f"no maps in {args.maps}/")
+        return 1
+    jobs = max(1, min(args.jobs, len(names)))
+    t0 = time.perf_counter()
+    results, failed = {}, {}
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(args.maps, args.sprites, args.cache_dir)) as pool:
+        futures = {pool.submit(_bake_one, name, args.force): name for name in names}
+        for fut in as_completed(futures):
+            name = futures[fut]
+            try:
+                results[name] = fut.result()
+            except Exception as e:  # keep baking the others; report at the end
+                failed[name] = f"{type(e).__name__}: {e}"
+    total = time.perf_counter() - t0
+
+    index = RoomIndex(args.maps, args.index)
+    assets = RoomMap(args.maps, args.sprites, cache_dir=args.cache_dir).assets
+    for r in results.values():
+        index.add(r.pop("meta"), r.pop("stamp"))
+        assets.absorb(r.pop("assets"))
+    index.save()
+    assets.save()
+
+    manifest = {
+        "maps_dir": Path(args.maps).resolve().as_posix(),
+        "jobs": jobs,
+        "total_seconds": round(total, 4),
+        "rooms": {name: results[name] for name in sorted(results)},
+        "failed": failed,
+    }
+    cache_dir = Path(args.cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    (cache_dir / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+    for name in sorted(results):
+        r = results[name]
+        kind = "streamed" if r["streamed"] else f"{r['bytes'] / 1024:.0f} KiB"
+        print(f"{name:<16}{r['seconds'] * 1000:>8.1f} ms  {kind:>10}  doors={r['doors']} solids={r['solids']}")
+    for name, err in sorted(failed.items()):
+        print(f"{name:<16}FAILED  {err}")
+    print(f"baked {len(results)}/{len(names)} rooms with {jobs} worker(s) in {total:.2f}s -> {cache_dir}/")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""Benchmark a shared flow field against per-chaser path queries.
+
+N chasers run at a player wandering a generated room (random pillars); the
+player changes tile every few frames. Each frame every chaser asks for its
+next tile, either from its own GridPathfinder query (LRU-cached, tail reuse)
+or from the room's FlowField (recomputed only when the player's tile
+changes), and steps there. Run from anywhere:
+
+    python scripts/bench_flow.py [--size 64] [--chasers 10 50 200] [--frames 600]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)
+
+from flow_field import FlowField
+from tile_nav import GridPathfinder, bfs_distances
+
+
+def make_room(size: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    walk = rng.random((size, size)) > 0.25
+    walk[size // 2, :] = True
+    # keep the largest open region only, so every chaser can reach the player
+    cells = np.argwhere(walk)
+    y, x = cells[len(cells) // 2]
+    return bfs_distances(walk, (int(x), int(y))) >= 0
+
+
+def run(walk: np.ndarray, chasers: int, frames: int, seed: int, use_field: bool):
+    rnd = random.Random(seed)
+    cells = [(int(x), int(y)) for y, x in np.argwhere(walk)]
+    player = rnd.choice(cells)
+    monsters = rnd.sample(cells, chasers)
+    finder, field = GridPathfinder(walk), FlowField(walk)
+    times = []
+    for f in range(frames):
+        if f % 8 == 0:  # player crosses a tile about every 8 frames
+            x, y = player
+            options = [(x + dx, y + dy) for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1))
+                       if 0 <= x + dx < walk.shape[1] and 0 <= y + dy < walk.shape[0] and walk[y + dy, x + dx]]
+            player = rnd.choice(options) if options else player
+        t0 = time.perf_counter()
+        if use_field:
+            field.retarget(player)
+            steps = [field.next_cell(m) for m in monsters]
+        else:
+            steps = [finder.next_waypoint(m, player) for m in monsters]
+        times.append(time.perf_counter() - t0)
+        monsters = [s if s is not None else m for m, s in zip(monsters, steps)]
+    return times, field.recomputes
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--size", type=int, default=64)
+    ap.add_argument("--chasers", type=int, nargs="+", default=[10, 50, 200])
+    ap.add_argument("--frames", type=int, default=600)
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    walk = make_room(args.size, args.seed)
+    print(f"{args.size}x{args.size} room, {int(walk.sum())} open tiles, {args.frames} frames")
+    print(f"{'chasers':>8}{'paths ms/frame':>16}{'worst ms':>10}{'field ms/frame':>16}{'worst ms':>10}"
+          f"{'recomputes':>12}{'speedup':>9}")
+    for n in args.chasers:
+        paths, _ = run(walk, n, args.frames, args.seed, use_field=False)
+        flow, recomputes = run(walk, n, args.frames, args.seed, use_field=True)
+        mean_p, mean_f = sum(paths) / len(paths), sum(flow) / len(flow)
+        print(f"{n:>8}{mean_p * 1e3:>16.3f}{max(paths) * 1e3:>10.2f}{mean_f * 1e3:>16.3f}{max(flow) * 1e3:>10.2f}"
+              f"{recomputes:>12}{mean_p / mean_f:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Benchmark incremental replanning (D* Lite) against searching from scratch.
+
+On a generated dungeon, changes the danger of one room at a time (half of
+them on the current cheapest route, where a change matters) and times
+DStarLite's repair against a full UCSGraph search on the updated graph,
+checking that both find the same cost. Run from anywhere:
+
+    python scripts/bench_replan.py [--rooms 10000 100000] [--changes 40]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)
+
+from dstar_lite import DStarLite
+from graph_core import generate_dungeon
+from UCS.ucs_new import UCSGraph
+
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--rooms", type=int, nargs="+", default=[10_000, 100_000])
+    ap.add_argument("--changes", type=int, default=40)
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    print(f"{'rooms':>8}{'first search ms':>17}{'full UCS ms':>13}{'replan ms':>11}"
+          f"{'worst ms':>10}{'expanded':>10}{'speedup':>9}")
+    for n in args.rooms:
+        graph = generate_dungeon(n, seed=args.seed)
+        start, goal = 0, n - 1
+        t0 = time.perf_counter()
+        engine = DStarLite(graph, start, goal)
+        _, path = engine.search()
+        t_first = time.perf_counter() - t0
+        ucs = UCSGraph(graph, start, goal)
+
+        rnd = random.Random(args.seed)
+        replans, fulls, expanded = [], [], []
+        for k in range(args.changes):
+            room = rnd.choice(path[1:-1]) if k % 2 and len(path) > 2 else rnd.randrange(n)
+            danger = rnd.choice([1, 3, 10, 50])
+            before = engine.expanded
+            t0 = time.perf_counter()
+            engine.set_danger(room, danger)
+            cost, path = engine.search()
+            replans.append(time.perf_counter() - t0)
+            expanded.append(engine.expanded - before)
+            t0 = time.perf_counter()
+            full_cost, _ = ucs.uniform_cost_search(start, goal)
+            fulls.append(time.perf_counter() - t0)
+            assert abs(cost - full_cost) <= 1e-6 * max(1.0, full_cost), f"cost differs at {n} rooms: {cost} != {full_cost}"
+        print(f"{n:>8}{t_first * 1e3:>17.1f}{median(fulls) * 1e3:>13.1f}{median(replans) * 1e3:>11.2f}"
+              f"{max(replans) * 1e3:>10.1f}{median(expanded):>10}{median(fulls) / median(replans):>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""Benchmark path-copying searches against parent-pointer reconstruction.
+
+The room-graph searches used to carry the whole path in every frontier entry
+(`new_path = path + [current]`), which makes a search O(L^2) in the path
+length L. They now record one predecessor per expanded room and rebuild the
+path once. This times both on corridor graphs (a long chain of rooms with a
+dead-end side room at every step) of growing length; the old versions are
+kept below as the baseline. It then replays a repeated-query workload (with
+a door added every so often) through SEARCH_CACHE and prints its stats.
+Run from anywhere:
+
+    python scripts/bench_search.py [--lengths 500 1000 2000 4000 8000] [--queries 2000]
+"""
+import argparse
+import heapq
+import itertools
+import os
+import random
+import sys
+import time
+from collections import deque
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "BFS"))
+os.chdir(ROOT)
+
+import A_star
+import BFSver3
+from UCS import ucs_new
+from search_cache import SEARCH_CACHE
+
+
+# ---------- previous (path-copying) implementations ----------
+def astar_path_copy(start, goal):
+    frontier = [(start.heuristic, 0, start, 0, [])]
+    counter = itertools.count(1)
+    visited = set()
+    while frontier:
+        _, _, current, g_score, path = heapq.heappop(frontier)
+        if current.name in visited:
+            continue
+        visited.add(current.name)
+        new_path = path + [current]
+        if current == goal:
+            return g_score, new_path
+        for neighbor, edge_cost in current.doors.values():
+            new_g = g_score + neighbor.danger_cost + edge_cost
+            heapq.heappush(frontier, (new_g + neighbor.heuristic, next(counter), neighbor, new_g, new_path))
+    return float("inf"), []
+
+
+def ucs_path_copy(start, goal):
+    frontier = [(0, 0, start, [])]
+    counter = itertools.count(1)
+    visited = set()
+    while frontier:
+        cost, _, current, path = heapq.heappop(frontier)
+        if current.name in visited:
+            continue
+        visited.add(current.name)
+        new_path = path + [current]
+        if current.name == goal.name:
+            return cost, new_path
+        for neighbor, edge_cost in current.doors.values():
+            heapq.heappush(frontier, (cost + neighbor.danger_cost + edge_cost, next(counter), neighbor, new_path))
+    return float("inf"), []
+
+
+def bfs_path_copy(start, goal):
+    queue = deque([(start, [])])
+    visited = set()
+    while queue:
+        current, path = queue.popleft()
+        if current in visited:
+            continue
+        visited.add(current)
+        new_path = path + [current]
+        if current == goal:
+            return new_path
+        for neighbor in current.doors.values():
+            if neighbor not in visited:
+                queue.append((neighbor, new_path))
+    return []
+
+
+# ---------- corridor graphs ----------
+def corridor(length: int):
+    """Two-way chain room0..room<length-1>, plus a dead-end side room per step."""
+    nodes = {}
+    for i in range(length):
+        nodes[f"room{i}"] = A_star.Node(f"room{i}", danger_cost=1 + i % 5, x=i, y=0)
+        nodes[f"side{i}"] = A_star.Node(f"side{i}", danger_cost=3, x=i, y=1)
+    for i in range(length):
+        room, side = nodes[f"room{i}"], nodes[f"side{i}"]
+        room.add_door("door_side", side, 1.0)
+        side.add_door("door_back", room, 1.0)
+        if i + 1 < length:
+            nxt = nodes[f"room{i + 1}"]
+            room.add_door("door_next", nxt, 1.0)
+            nxt.add_door("door_prev", room, 1.0)
+    bfs_nodes = {name: BFSver3.Node(name) for name in nodes}
+    for name, node in nodes.items():
+        for door, (neighbor, _) in node.doors.items():
+            bfs_nodes[name].add_door(door, bfs_nodes[neighbor.name])
+    return nodes, bfs_nodes
+
+
+def timed(fn, repeat: int):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def cache_workload(length: int, queries: int, edit_every: int = 500):
+    """Same-goal cost queries from a few dozen rooms, like the panels make;
+    every `edit_every` queries a door is added, which invalidates the cache."""
+    def run(cached: bool) -> float:
+        nodes, _ = corridor(length)
+        ucs = ucs_new.UCSGame(nodes, "room0", f"room{length - 1}")
+        rnd = random.Random(0)
+        origins = [nodes[f"room{rnd.randrange(length)}"] for _ in range(32)]
+        t0 = time.perf_counter()
+        for k in range(queries):
+            if k and k % edit_every == 0:
+                rnd.choice(origins).add_door(f"door_extra{k}", nodes[f"side{rnd.randrange(length)}"], 5.0)
+            ucs.current = rnd.choice(origins)
+            if cached:
+                ucs.get_least_cost_to_goal()
+            else:
+                ucs.uniform_cost_search(ucs.current, ucs.goal)
+        return time.perf_counter() - t0
+
+    t_raw = run(cached=False)
+    SEARCH_CACHE.clear()
+    t_cached = run(cached=True)
+    print(f"\n{queries} UCS queries on a {length}-room corridor: "
+          f"uncached {t_raw * 1e3:.1f} ms, cached {t_cached * 1e3:.1f} ms ({t_raw / t_cached:.1f}x)")
+    print("cache:", SEARCH_CACHE.stats())
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--lengths", type=int, nargs="+", default=[500, 1000, 2000, 4000, 8000])
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--queries", type=int, default=2000, help="repeated-query workload size (0 = skip)")
+    args = ap.parse_args()
+
+    print(f"{'length':>7} {'algorithm':<6}{'path copy ms':>14}{'parents ms':>12}{'speedup':>9}")
+    for length in args.lengths:
+        nodes, bfs_nodes = corridor(length)
+        start, goal = "room0", f"room{length - 1}"
+        a_star = A_star.A_star_game(nodes, start, goal)  # also sets node.heuristic
+        ucs = ucs_new.UCSGame(nodes, start, goal)
+        bfs = BFSver3.BFSGame(bfs_nodes, start, goal)
+        cases = [
+            ("A*", lambda: astar_path_copy(nodes[start], nodes[goal]), a_star.search),
+            ("UCS", lambda: ucs_path_copy(nodes[start], nodes[goal]),
+             lambda: ucs.uniform_cost_search(nodes[start], nodes[goal])),
+            ("BFS", lambda: bfs_path_copy(bfs_nodes[start], bfs_nodes[goal]),
+             lambda: bfs.breadth_first_search(bfs_nodes[start], bfs_nodes[goal])),
+        ]
+        for label, old, new in cases:
+            t_old, r_old = timed(old, args.repeat)
+            t_new, r_new = timed(new, args.repeat)
+            assert r_old == r_new, f"{label}: results differ at length {length}"
+            print(f"{length:>7} {label:<6}{t_old * 1e3:>14.2f}{t_new * 1e3:>12.2f}{t_old / t_new:>8.1f}x")
+    if args.queries:
+        cache_workload(args.lengths[0], args.queries)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Benchmark the UCS engines (heap, bidirectional, bucket) on generated dungeons.
+
+For each dungeon size it runs three kinds of query through
+UCSGraph.uniform_cost_search with every engine, checks that they agree on
+the cost and prints the median time per query:
+
+    far     corner to corner (room 0 to the last room)
+    random  two random rooms
+    near    a room and another one a few doors away
+
+Run from anywhere:
+
+    python scripts/bench_ucs.py [--rooms 10000 100000] [--queries 15] [--near-hops 8]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)
+
+from graph_core import generate_dungeon
+from UCS.ucs_new import ENGINES, UCSGraph
+
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def queries(graph, kind: str, count: int, hops: int, rnd: random.Random):
+    n = len(graph)
+    if kind == "far":
+        return [(0, n - 1)] * max(1, count // 5)
+    if kind == "random":
+        return [(rnd.randrange(n), rnd.randrange(n)) for _ in range(count)]
+    pairs = []
+    for _ in range(count):
+        a = b = rnd.randrange(n)
+        for _ in range(hops):
+            b = rnd.choice(graph.doors(b))[0]
+        pairs.append((a, b))
+    return pairs
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--rooms", type=int, nargs="+", default=[10_000, 100_000])
+    ap.add_argument("--queries", type=int, default=15)
+    ap.add_argument("--near-hops", type=int, default=8)
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    others = [e for e in ENGINES if e != "heap"]
+    print(f"{'rooms':>8} {'query':<7}" + "".join(f"{e + ' ms':>18}" for e in ENGINES)
+          + "".join(f"{e + ' x':>17}" for e in others))
+    for n in args.rooms:
+        graph = generate_dungeon(n, seed=args.seed)
+        search = UCSGraph(graph, 0, n - 1)
+        search.uniform_cost_search(0, 0, "bidirectional")  # build the reverse CSR
+        search.uniform_cost_search(0, 0, "bucket")         # and the integer step costs once
+        rnd = random.Random(args.seed)
+        for kind in ("far", "random", "near"):
+            times = {e: [] for e in ENGINES}
+            for a, b in queries(graph, kind, args.queries, args.near_hops, rnd):
+                costs = {}
+                for engine in ENGINES:
+                    t0 = time.perf_counter()
+                    costs[engine], _ = search.uniform_cost_search(a, b, engine)
+                    times[engine].append(time.perf_counter() - t0)
+                ref = costs["heap"]
+                assert all(abs(c - ref) <= 1e-9 * max(1.0, ref) for c in costs.values()), \
+                    f"engines disagree on {a} -> {b}: {costs}"
+            med = {e: median(t) for e, t in times.items()}
+            print(f"{n:>8} {kind:<7}" + "".join(f"{med[e] * 1e3:>18.2f}" for e in ENGINES)
+                  + "".join(f"{med['heap'] / med[e]:>16.1f}x" for e in others))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Memoized room-graph search results.
+
+Callers ask the same (start, goal, algorithm) questions over and over
+(UCSGame.get_least_cost_to_goal, BFSGame.get_shortest_path_to_goal, tools
+sweeping rooms). SearchCache keeps the answers in a bounded LRU keyed by
+(graph version, start, goal, algorithm, cost model), where the version is
+the identity of the searched node dict plus a global change counter.
+
+The graph version is a process-wide counter bumped by every Node.add_door
+(A_star, UCS and BFS nodes) and by Game.connect_doors, so a cached answer
+can never outlive the graph it was computed on. Code that changes costs
+some other way (e.g. assigning danger_cost directly) must call
+bump_graph_version() itself.
+"""
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+try:
+    from constants import SEARCH_CACHE_SIZE
+except Exception:
+    SEARCH_CACHE_SIZE = 1024
+
+_graph_version = 0
+
+
+def graph_version() -> int:
+    return _graph_version
+
+
+def bump_graph_version() -> int:
+    """Mark every room graph as changed; returns the new version."""
+    global _graph_version
+    _graph_version += 1
+    return _graph_version
+
+
+class SearchCache:
+    """LRU of search results; entries from older graph versions are dropped
+    as soon as a lookup sees the version move on."""
+
+    def __init__(self, max_entries: int = SEARCH_CACHE_SIZE):
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[tuple, object]" = OrderedDict()
+        self._version = graph_version()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def lookup(self, graph, algorithm: str, cost_model: str, start: Hashable, goal: Hashable,
+               compute: Callable[[], object]):
+        """Cached result of `compute()` for this query on `graph` (any object
+        standing for the graph, e.g. the game's nodes dict), computing it on a miss."""
+        version = graph_version()
+        if version != self._version:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._version = version
+        key = ((id(graph), version), start, goal, algorithm, cost_model)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+        self.misses += 1
+        result = self._entries[key] = compute()
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return result
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "size": len(self._entries), "evictions": self.evictions,
+                "invalidations": self.invalidations, "graph_version": self._version}
+
+
+# shared by the game's search classes and tools
+SEARCH_CACHE = SearchCache()
@@ -0,0 +1,178 @@
+"""Spatial lookups for rooms: a uniform-grid hash for axis-aligned rects
+(collision broad phase) and a per-tile flag grid for hazard/bomb tests."""
+from __future__ import annotations
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+import pygame
+
+from constants import TILE
+
+
+class SpatialGrid:
+    """Buckets rects by the grid cells they overlap.
+
+    query(rect) returns only rects sharing a cell with `rect`, in insertion
+    order, so callers see the same ordering a flat list scan would give.
+    """
+
+    def __init__(self, cell: int = TILE, rects: Iterable[pygame.Rect] = ()):
+        self.cell = cell
+        self._cells: Dict[Tuple[int, int], List[int]] = {}
+        self._rects: Dict[int, pygame.Rect] = {}   # id -> rect (ids grow with insertion)
+        self._by_key: Dict[Tuple[int, int, int, int], List[int]] = {}
+        self._next_id = 0
+        for r in rects:
+            self.insert(r)
+
+    def __len__(self) -> int:
+        return len(self._rects)
+
+    def _span(self, r: pygame.Rect):
+        c = self.cell
+        return range(r.left // c, (r.right - 1) // c + 1), range(r.top // c, (r.bottom - 1) // c + 1)
+
+    def insert(self, rect: pygame.Rect) -> int:
+        rid = self._next_id
+        self._next_id += 1
+        self._rects[rid] = rect
+        self._by_key.setdefault(tuple(rect), []).append(rid)
+        xs, ys = self._span(rect)
+        for cy in ys:
+            for cx in xs:
+                self._cells.setdefault((cx, cy), []).append(rid)
+        return rid
+
+    def remove(self, rect: pygame.Rect) -> bool:
+        """Remove one rect equal to `rect`; False if none is stored."""
+        ids = self._by_key.get(tuple(rect))
+        if not ids:
+            return False
+        rid = ids.pop()
+        if not ids:
+            del self._by_key[tuple(rect)]
+        stored = self._rects.pop(rid)
+        xs, ys = self._span(stored)
+        for cy in ys:
+            for cx in xs:
+                bucket = self._cells.get((cx, cy))
+                if bucket is not None:
+                    bucket.remove(rid)
+                    if not bucket:
+                        del self._cells[(cx, cy)]
+        return True
+
+    def query(self, rect: pygame.Rect) -> List[pygame.Rect]:
+        """Rects that may overlap `rect` (all rects sharing a grid cell with it)."""
+        c = self.cell
+        x0, x1 = rect.left // c, (rect.right - 1) // c
+        y0, y1 = rect.top // c, (rect.bottom - 1) // c
+        cells = self._cells
+        if x0 == x1 and y0 == y1:  # common case: fits one cell, bucket is already ordered
+            bucket = cells.get((x0, y0))
+            return [self._rects[i] for i in bucket] if bucket else []
+        xs, ys = range(x0, x1 + 1), range(y0, y1 + 1)
+        found: set[int] = set()
+        for cy in ys:
+            for cx in xs:
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    found.update(bucket)
+        rects = self._rects
+        return [rects[i] for i in sorted(found)]
+
+    def update(self, old: Iterable[pygame.Rect], new: Iterable[pygame.Rect]) -> None:
+        """Incrementally replace rect set `old` by `new` (only the difference is touched)."""
+        new = list(new)
+        remaining = {}
+        for r in new:
+            remaining[tuple(r)] = remaining.get(tuple(r), 0) + 1
+        for r in old:
+            k = tuple(r)
+            if remaining.get(k):
+                remaining[k] -= 1  # unchanged: keep it
+            else:
+                self.remove(r)
+        for r in new:
+            k = tuple(r)
+            if remaining.get(k):
+                remaining[k] -= 1
+                self.insert(r)
+
+
+class TileFlagGrid:
+    """uint8 bitfield per tile (row-major, tile (0, 0) at pixel (0, 0))."""
+
+    HAZARD = 1 << 0
+    BOMB   = 1 << 1
+    TRAP   = 1 << 2
+    LAMP   = 1 << 3
+    DOOR   = 1 << 4
+    SOLID  = 1 << 5
+
+    def __init__(self, flags: np.ndarray, cell: int = TILE):
+        self.flags = np.asarray(flags, dtype=np.uint8)
+        self.cell = cell
+        self.h, self.w = self.flags.shape
+        self._rows = [row.tobytes() for row in self.flags]  # cheap scalar reads
+
+    def flags_at(self, tx: int, ty: int) -> int:
+        return self._rows[ty][tx] if 0 <= tx < self.w and 0 <= ty < self.h else 0
+
+    def cells_under(self, rect: pygame.Rect, bits: int, reach: int = 0) -> List[Tuple[int, int]]:
+        """Tiles (row-major) with any of `bits` set that `rect` overlaps.
+
+        `reach` also takes in tiles up to that many pixels above/left of the
+        rect, for flagged rects that overhang their tile by a few pixels.
+        """
+        c = self.cell
+        x0, x1 = max(0, (rect.left - reach) // c), min(self.w - 1, (rect.right - 1) // c)
+        y0, y1 = max(0, (rect.top - reach) // c), min(self.h - 1, (rect.bottom - 1) // c)
+        rows = self._rows
+        return [(tx, ty) for ty in range(y0, y1 + 1) for tx in range(x0, x1 + 1) if rows[ty][tx] & bits]
+
+
+class FlaggedRects:
+    """First-match overlap queries over a rect list, without scanning it.
+
+    Rects that sit on a tile carrying `bit` in the flag grid (and fit within
+    the tile plus `reach` pixels) are found through the grid; the rest (e.g.
+    object-layer rects) go into a small SpatialGrid. first_hit() returns what
+    a linear `colliderect` scan of `rects` would.
+    """
+
+    def __init__(self, rects: List[pygame.Rect], grid: TileFlagGrid, bit: int, reach: int = 1):
+        self.rects = rects
+        self.grid = grid
+        self.bit = bit
+        self.reach = reach
+        self._by_tile: Dict[Tuple[int, int], List[int]] = {}
+        self._loose_index: Dict[int, int] = {}   # id(rect) -> list index
+        loose = []
+        c, limit = grid.cell, grid.cell + reach
+        for i, r in enumerate(rects):
+            tx, ty = r.x // c, r.y // c
+            if (r.x % c == 0 and r.y % c == 0 and 0 < r.w <= limit and 0 < r.h <= limit
+                    and grid.flags_at(tx, ty) & bit):
+                self._by_tile.setdefault((tx, ty), []).append(i)
+            else:
+                self._loose_index[id(r)] = i
+                loose.append(r)
+        self._loose = SpatialGrid(c, loose)
+
+    def first_hit(self, rect: pygame.Rect) -> pygame.Rect | None:
+        rects = self.rects
+        best = None
+        for cell in self.grid.cells_under(rect, self.bit, self.reach):
+            for i in self._by_tile.get(cell, ()):
+                if (best is None or i < best) and rect.colliderect(rects[i]):
+                    best = i
+                    break
+        if len(self._loose):
+            for r in self._loose.query(rect):
+                if rect.colliderect(r):
+                    i = self._loose_index[id(r)]
+                    if best is None or i < best:
+                        best = i
+                    break   # query() yields list order: later loose rects can't win
+        return None if best is None else rects[best]
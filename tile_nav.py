@@ -0,0 +1,380 @@
+"""Tile-level navigation inside one room.
+
+A tile is walkable if it is a floor or door cell, not a blocked wall tile,
+and its centre isn't inside an object-layer solid (statues, pillars); door
+cells always stay walkable. Door-to-door distances count 4-connected steps
+between tile centres and come from a vectorized BFS wavefront over the whole
+grid; entities steer along 8-connected paths from GridPathfinder (over
+clearance_mask() blocks for entities wider than a tile).
+"""
+from __future__ import annotations
+import heapq
+import itertools
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from constants import TILE
+from graph_core import walk_parents
+
+try:
+    from constants import PATH_CACHE_SIZE
+except Exception:
+    PATH_CACHE_SIZE = 256
+
+Cell = Tuple[int, int]  # (x, y) in tiles
+
+
+def walkable_mask(shape: Tuple[int, int], floor_cells: Iterable[Cell], door_cells: Sequence[Cell],
+                  blocked: np.ndarray | None = None, loose_solids: Iterable = (), tile: int = TILE,
+                  touching: bool = False) -> np.ndarray:
+    """Boolean (h, w) grid of walkable tiles. With `touching`, a loose solid
+    closes every tile it overlaps, not just those whose centre it covers
+    (for steering a body, which must not brush against it)."""
+    h, w = shape
+    walk = np.zeros((h, w), dtype=bool)
+
+    def mark(cells, value):
+        cells = np.asarray(list(cells), dtype=np.int64).reshape(-1, 2)
+        inside = (cells[:, 0] >= 0) & (cells[:, 0] < w) & (cells[:, 1] >= 0) & (cells[:, 1] < h)
+        walk[cells[inside, 1], cells[inside, 0]] = value
+
+    mark(floor_cells, True)
+    if blocked is not None:
+        walk &= ~np.asarray(blocked, dtype=bool)
+    for r in loose_solids:
+        if touching:
+            x0, x1 = max(0, r.left // tile), min(w, (r.right - 1) // tile + 1)
+            y0, y1 = max(0, r.top // tile), min(h, (r.bottom - 1) // tile + 1)
+            if x0 < x1 and y0 < y1:
+                walk[y0:y1, x0:x1] = False
+            continue
+        # tiles whose centre lies inside the rect
+        x0, x1 = max(0, (r.left - tile // 2 + tile - 1) // tile), min(w, (r.right - tile // 2 - 1) // tile + 1)
+        y0, y1 = max(0, (r.top - tile // 2 + tile - 1) // tile), min(h, (r.bottom - tile // 2 - 1) // tile + 1)
+        if x0 < x1 and y0 < y1:
+            walk[y0:y1, x0:x1] = False
+    mark(door_cells, True)
+    return walk
+
+
+def room_walkable(room, touching: bool = False) -> np.ndarray:
+    """walkable_mask() for a room_map.Room."""
+    return walkable_mask(room.blocked.shape, room.floor_cells, room.door_cells,
+                         room.blocked, room.loose_solids, touching=touching)
+
+
+def clearance_mask(walk: np.ndarray, size: int) -> np.ndarray:
+    """Grid of `size` x `size` tile blocks that are entirely walkable, indexed
+    by their top-left tile: where an entity `size` tiles wide can stand."""
+    if size <= 1:
+        return walk
+    h, w = walk.shape
+    out = np.zeros_like(walk)
+    if h < size or w < size:
+        return out
+    fits = walk[: h - size + 1, : w - size + 1].copy()
+    for dy in range(size):
+        for dx in range(size):
+            fits &= walk[dy: h - size + 1 + dy, dx: w - size + 1 + dx]
+    out[: h - size + 1, : w - size + 1] = fits
+    return out
+
+
+def bfs_distances(walk: np.ndarray, source: Cell) -> np.ndarray:
+    """Steps from `source` to every tile (int32, -1 where unreachable). The
+    source itself needn't be walkable (e.g. the player brushing a wall)."""
+    h, w = walk.shape
+    dist = np.full((h, w), -1, dtype=np.int32)
+    x, y = source
+    if not (0 <= x < w and 0 <= y < h):
+        return dist
+    frontier = np.zeros((h, w), dtype=bool)
+    frontier[y, x] = True
+    nxt = np.empty_like(frontier)
+    d = 0
+    while frontier.any():
+        dist[frontier] = d
+        nxt[:] = False
+        nxt[1:] |= frontier[:-1]
+        nxt[:-1] |= frontier[1:]
+        nxt[:, 1:] |= frontier[:, :-1]
+        nxt[:, :-1] |= frontier[:, 1:]
+        frontier = nxt & walk & (dist < 0)
+        d += 1
+    return dist
+
+
+def door_distance_table(walk: np.ndarray, door_cells: Sequence[Cell]) -> np.ndarray:
+    """(D, D) int32 walking distances between door cells (-1 if unreachable)."""
+    n = len(door_cells)
+    table = np.full((n, n), -1, dtype=np.int32)
+    if not n:
+        return table
+    xs = np.array([c[0] for c in door_cells])
+    ys = np.array([c[1] for c in door_cells])
+    for i, cell in enumerate(door_cells):
+        table[i] = bfs_distances(walk, cell)[ys, xs]
+    return table
+
+
+def descend(dist: np.ndarray, target: Cell) -> List[Cell]:
+    """Tile path source..target down a bfs_distances() field ([] if unreachable)."""
+    x, y = target
+    h, w = dist.shape
+    if not (0 <= x < w and 0 <= y < h) or dist[y, x] < 0:
+        return []
+    path = [(x, y)]
+    d = int(dist[y, x])
+    while d > 0:
+        for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            if 0 <= nx < w and 0 <= ny < h and dist[ny, nx] == d - 1:
+                x, y, d = nx, ny, d - 1
+                path.append((x, y))
+                break
+    path.reverse()
+    return path
+
+
+# ---------- 8-connected paths (A* / jump point search) ----------
+SQRT2 = 2 ** 0.5
+DIRS = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1))
+
+
+def octile(a: Cell, b: Cell) -> float:
+    dx, dy = abs(a[0] - b[0]), abs(a[1] - b[1])
+    return (dx + dy) + (SQRT2 - 2) * min(dx, dy)
+
+
+class GridPathfinder:
+    """Shortest 8-connected tile paths on one room's walkable grid.
+
+    Diagonal steps cost sqrt(2) and may not cut a blocked corner (both
+    orthogonal neighbours must be open), so a walker following the tile
+    centres never clips a wall corner. Uniform grids use jump point search
+    (same paths as A*, far fewer heap operations); with per-tile `weights`
+    (a step costs its length times the weight of the tile entered) it falls
+    back to plain A*. Paths are cached per (start, goal) in an LRU.
+    """
+
+    def __init__(self, walk: np.ndarray, weights: np.ndarray | None = None, cache_size: int = PATH_CACHE_SIZE):
+        self.walk = np.asarray(walk, dtype=bool)
+        self.h, self.w = self.walk.shape
+        # padded with a closed border, flattened: open tile test without bounds checks
+        padded = np.zeros((self.h + 2, self.w + 2), dtype=np.uint8)
+        padded[1:-1, 1:-1] = walk
+        self._stride = self.w + 2
+        self._open = padded.tobytes()
+        self.weights = None if weights is None else np.asarray(weights, dtype=np.float64)
+        self._w_min = float(self.weights.min()) if self.weights is not None and self.weights.size else 1.0
+        self.cache_size = max(1, cache_size)
+        self._cache: "OrderedDict[Tuple[Cell, Cell], List[Cell]]" = OrderedDict()
+        # goal -> (latest path searched to it, tile -> index in that path)
+        self._latest: "OrderedDict[Cell, Tuple[List[Cell], Dict[Cell, int]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def is_open(self, x: int, y: int) -> bool:
+        return self._open[(y + 1) * self._stride + x + 1] == 1
+
+    # ---------- queries ----------
+    def find_path(self, start: Cell, goal: Cell) -> List[Cell]:
+        """Tiles start..goal ([] if the goal can't be reached); cached."""
+        key = ((int(start[0]), int(start[1])), (int(goal[0]), int(goal[1])))
+        path = self._cache.get(key)
+        if path is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return path
+        start, goal = key
+        latest = self._latest.get(goal)
+        if latest is not None and start in latest[1]:
+            # walker still on the latest path to this goal: its tail is the answer
+            path = latest[0][latest[1][start]:]
+            self.hits += 1
+        else:
+            path = self._search(start, goal)
+            self.misses += 1
+            self._latest[goal] = (path, {cell: i for i, cell in enumerate(path)})
+            self._latest.move_to_end(goal)
+            while len(self._latest) > 16:
+                self._latest.popitem(last=False)
+        self._cache[key] = path
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return path
+
+    def next_waypoint(self, start: Cell, goal: Cell) -> Cell | None:
+        """Next tile to head for from `start` towards `goal`: the goal itself
+        once adjacent, None if it can't be reached. Cheap to call every frame."""
+        path = self.find_path(start, goal)
+        if not path:
+            return None
+        return path[1] if len(path) > 1 else path[0]
+
+    def next_step(self, start: Cell, goal: Cell) -> Cell | None:
+        """Tile after `start` on the path to `goal`; None at the goal or if it
+        can't be reached (same contract as FlowField.next_step)."""
+        path = self.find_path(start, goal)
+        return path[1] if len(path) > 1 else None
+
+    def path_cost(self, path: Sequence[Cell]) -> float:
+        cost = 0.0
+        for (x0, y0), (x1, y1) in zip(path, path[1:]):
+            step = SQRT2 if x0 != x1 and y0 != y1 else 1.0
+            cost += step * (self.weights[y1, x1] if self.weights is not None else 1.0)
+        return cost
+
+    def _search(self, start: Cell, goal: Cell) -> List[Cell]:
+        inside = lambda c: 0 <= c[0] < self.w and 0 <= c[1] < self.h
+        if not (inside(start) and inside(goal)) or not self.is_open(*goal):
+            return []
+        if start == goal:
+            return [start]
+        if self.weights is None:
+            return self._jps(start, goal)
+        return self._astar(start, goal)
+
+    # ---------- plain A* ----------
+    def _step_ok(self, x: int, y: int, dx: int, dy: int) -> bool:
+        if not self.is_open(x + dx, y + dy):
+            return False
+        return not (dx and dy) or (self.is_open(x + dx, y) and self.is_open(x, y + dy))
+
+    def _astar(self, start: Cell, goal: Cell) -> List[Cell]:
+        weights = self.weights
+        counter = itertools.count()
+        best = {start: 0.0}
+        parent: Dict[Cell, Cell | None] = {start: None}
+        frontier = [(octile(start, goal) * self._w_min, next(counter), start, 0.0)]
+        closed = set()
+        while frontier:
+            _, _, cell, g = heapq.heappop(frontier)
+            if cell in closed:
+                continue
+            closed.add(cell)
+            if cell == goal:
+                return walk_parents(parent, cell)
+            x, y = cell
+            for dx, dy in DIRS:
+                if not self._step_ok(x, y, dx, dy):
+                    continue
+                nxt = (x + dx, y + dy)
+                ng = g + (SQRT2 if dx and dy else 1.0) * weights[nxt[1], nxt[0]]
+                if ng < best.get(nxt, float("inf")):
+                    best[nxt] = ng
+                    parent[nxt] = cell
+                    heapq.heappush(frontier, (ng + octile(nxt, goal) * self._w_min, next(counter), nxt, ng))
+        return []
+
+    # ---------- jump point search ----------
+    def _neighbours(self, x: int, y: int, px: int | None, py: int | None) -> List[Tuple[int, int]]:
+        """Directions worth jumping in from (x, y), reached from (px, py)."""
+        if px is None:
+            return [(dx, dy) for dx, dy in DIRS if self._step_ok(x, y, dx, dy)]
+        ok = self.is_open
+        dx = (x > px) - (x < px)
+        dy = (y > py) - (y < py)
+        dirs = []
+        if dx and dy:
+            if ok(x, y + dy):
+                dirs.append((0, dy))
+            if ok(x + dx, y):
+                dirs.append((dx, 0))
+            if ok(x, y + dy) and ok(x + dx, y):
+                dirs.append((dx, dy))
+        elif dx:
+            nxt, up, down = ok(x + dx, y), ok(x, y - 1), ok(x, y + 1)
+            if nxt:
+                dirs.append((dx, 0))
+                if up and ok(x + dx, y - 1):
+                    dirs.append((dx, -1))
+                if down and ok(x + dx, y + 1):
+                    dirs.append((dx, 1))
+            if up:
+                dirs.append((0, -1))
+            if down:
+                dirs.append((0, 1))
+        else:
+            nxt, left, right = ok(x, y + dy), ok(x - 1, y), ok(x + 1, y)
+            if nxt:
+                dirs.append((0, dy))
+                if left and ok(x - 1, y + dy):
+                    dirs.append((-1, dy))
+                if right and ok(x + 1, y + dy):
+                    dirs.append((1, dy))
+            if left:
+                dirs.append((-1, 0))
+            if right:
+                dirs.append((1, 0))
+        return dirs
+
+    def _jump_straight(self, x: int, y: int, dx: int, dy: int, goal: Cell) -> Cell | None:
+        ok = self.is_open
+        while True:
+            x += dx
+            y += dy
+            if not ok(x, y):
+                return None
+            if (x, y) == goal:
+                return x, y
+            if dx:
+                if (ok(x, y - 1) and not ok(x - dx, y - 1)) or (ok(x, y + 1) and not ok(x - dx, y + 1)):
+                    return x, y
+            elif (ok(x - 1, y) and not ok(x - 1, y - dy)) or (ok(x + 1, y) and not ok(x + 1, y - dy)):
+                return x, y
+
+    def _jump(self, x: int, y: int, dx: int, dy: int, goal: Cell) -> Cell | None:
+        if not (dx and dy):
+            return self._jump_straight(x, y, dx, dy, goal)
+        ok = self.is_open
+        while True:
+            if not (ok(x + dx, y) and ok(x, y + dy)):
+                return None  # no corner cutting
+            x += dx
+            y += dy
+            if not ok(x, y):
+                return None
+            if (x, y) == goal:
+                return x, y
+            if self._jump_straight(x, y, dx, 0, goal) or self._jump_straight(x, y, 0, dy, goal):
+                return x, y
+
+    def _jps(self, start: Cell, goal: Cell) -> List[Cell]:
+        counter = itertools.count()
+        best = {start: 0.0}
+        parent: Dict[Cell, Cell | None] = {start: None}
+        frontier = [(octile(start, goal), next(counter), start, 0.0)]
+        closed = set()
+        while frontier:
+            _, _, cell, g = heapq.heappop(frontier)
+            if cell in closed:
+                continue
+            closed.add(cell)
+            if cell == goal:
+                return self._expand(walk_parents(parent, cell))
+            x, y = cell
+            p = parent[cell]
+            for dx, dy in self._neighbours(x, y, *(p if p is not None else (None, None))):
+                jp = self._jump(x, y, dx, dy, goal)
+                if jp is None or jp in closed:
+                    continue
+                ng = g + octile(cell, jp)
+                if ng < best.get(jp, float("inf")):
+                    best[jp] = ng
+                    parent[jp] = cell
+                    heapq.heappush(frontier, (ng + octile(jp, goal), next(counter), jp, ng))
+        return []
+
+    @staticmethod
+    def _expand(jump_points: List[Cell]) -> List[Cell]:
+        """Every tile along the straight/diagonal runs between jump points."""
+        path = [jump_points[0]]
+        for tx, ty in jump_points[1:]:
+            x, y = path[-1]
+            dx, dy = (tx > x) - (tx < x), (ty > y) - (ty < y)
+            while (x, y) != (tx, ty):
+                x, y = x + dx, y + dy
+                path.append((x, y))
+        return path